@@ -0,0 +1,66 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Data Format Benchmark
+
+Compares how fast game_data can load the same item catalog from each
+registered data format (KEY: value text, JSON Lines, binary).
+
+Usage: python benchmark_data_formats.py [item_count] [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import game_data
+
+
+def generate_items(count):
+    """Build `count` item records that look like data/items.txt"""
+    types = [("weapon", "strength"), ("armor", "max_health"), ("consumable", "health")]
+    items = {}
+    for i in range(count):
+        item_type, stat = types[i % len(types)]
+        items[f"item_{i}"] = {
+            "item_id": f"item_{i}",
+            "name": f"Generated Item {i}",
+            "type": item_type,
+            "effect": f"{stat}:{i % 50 + 1}",
+            "cost": i % 500 + 10,
+            "description": "A generated item used for benchmarking the loaders",
+        }
+    return items
+
+
+def benchmark_formats(count=100000, repeats=3):
+    """
+    Write `count` items in every registered format and time load_items on
+    each (cache disabled). Returns {extension: (best_seconds, bytes)}.
+    """
+    items = generate_items(count)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for extension in game_data.DATA_FORMATS:
+            path = os.path.join(directory, "items" + extension)
+            game_data.write_items(items, path)
+
+            best = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                loaded = game_data.load_items(path, use_cache=False)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            assert len(loaded) == count
+            results[extension] = (best, os.path.getsize(path))
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"=== LOADING {count} ITEMS (best of {repeats}) ===")
+    for extension, (seconds, size) in benchmark_formats(count, repeats).items():
+        rate = count / seconds
+        print(f"{extension:7} {seconds:8.3f}s  {rate:12,.0f} items/s  {size / 1e6:8.1f} MB")
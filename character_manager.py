@@ -10,12 +10,34 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import asyncio
+import atexit
+import copy
+import lzma
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
     SaveFileCorruptedError,
     InvalidSaveDataError,
-    CharacterDeadError
+    CharacterDeadError,
+    ItemNotFoundError
+)
+from inventory_system import (
+    Inventory,
+    MAX_INVENTORY_SIZE,
+    MIRRORED_SLOTS,
+    NO_BONUSES,
+    STAT_NAMES,
+    adjust_base_stat,
+    equipped_items,
+    get_base_stats
 )
 
 # ============================================================================
@@ -57,9 +79,19 @@ def create_character(name, character_class):
         "magic": stats["magic"],
         "experience": 0,
         "gold": 100,
-        "inventory": [],
+        "inventory": Inventory(),
+        "inventory_capacity": MAX_INVENTORY_SIZE,
         "active_quests": [],
-        "completed_quests": []
+        "completed_quests": [],
+        # Stats without equipment; the fields above are the effective values
+        "base_stats": {
+            "max_health": stats["health"],
+            "strength": stats["strength"],
+            "magic": stats["magic"],
+        },
+        "equipment": {},
+        "equipment_bonuses": {},
+        "stats_version": 0,
     }
     return character
 
@@ -67,33 +99,17 @@ def create_character(name, character_class):
 def save_character(character, save_directory="data/save_games"):
     """
     Save character to file
-    """
-    os.makedirs(save_directory, exist_ok=True)
-    filename = f"{character['name']}_save.txt"
-    filepath = os.path.join(save_directory, filename)
-
-    inventory = ",".join(character.get("inventory", []))
-    active_quests = ",".join(character.get("active_quests", []))
-    completed_quests = ",".join(character.get("completed_quests", []))
-
-    content = [
-        f"NAME: {character['name']}",
-        f"CLASS: {character['class']}",
-        f"LEVEL: {character['level']}",
-        f"HEALTH: {character['health']}",
-        f"MAX_HEALTH: {character['max_health']}",
-        f"STRENGTH: {character['strength']}",
-        f"MAGIC: {character['magic']}",
-        f"EXPERIENCE: {character['experience']}",
-        f"GOLD: {character['gold']}",
-        f"INVENTORY: {inventory}",
-        f"ACTIVE_QUESTS: {active_quests}",
-        f"COMPLETED_QUESTS: {completed_quests}",
-    ]
-
-    with open(filepath, "w") as file:
-        file.write("\n".join(content))
 
+    save_directory may also be a .db/.sqlite file (SQLite backend) or any
+    location registered with register_save_backend().
+    """
+    data = serialize_character(character)
+    try:
+        get_save_backend(save_directory).save(character["name"], data, index_row(character))
+    finally:
+        # Only once the write is done: a load racing it may have cached
+        # the old save, and the generation bump also stops one in flight
+        _invalidate_cached(save_directory, character["name"])
     return True
 
 
@@ -121,78 +137,1564 @@ def load_character(character_name, save_directory="data/save_games"):
         SaveFileCorruptedError
         InvalidSaveDataError
     """
-    filename = f"{character_name}_save.txt"
-    filepath = os.path.join(save_directory, filename)
+    cache = _character_cache
+    if cache is None:
+        backend = get_save_backend(save_directory)
+        return _parse_loaded(backend, character_name, backend.load(character_name))
+
+    key = (save_directory, character_name)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    generation = cache.generation
+    backend = get_save_backend(save_directory)
+    data = backend.load(character_name)
+    character = _parse_loaded(backend, character_name, data)
+    cache.put(key, character, len(data), generation)
+    return _copy_character(character)
+
+
+def load_characters(names, save_directory="data/save_games", workers=None):
+    """
+    Load many characters at once using a thread pool (or the backend's
+    batch query). Returns {name: character dict or the exception raised
+    for it}, so one missing or corrupted save doesn't abort the batch.
+    """
+    backend = get_save_backend(save_directory)
+    names = list(names)
+    load_many = getattr(backend, "load_many", None)
+    if load_many is not None:
+        results = {}
+        for name, data in load_many(names).items():
+            results[name] = data if isinstance(data, Exception) else _capture(_parse_loaded, backend, name, data)
+        return results
+
+    def load_chunk(chunk):
+        return [(name, _capture(_load_from, backend, name)) for name in chunk]
+
+    return _run_batches(load_chunk, names, workers)
+
+
+def save_characters(characters, save_directory="data/save_games", workers=None):
+    """
+    Save many characters at once. Returns {name: True or the exception
+    raised for it}.
+    """
+    backend = get_save_backend(save_directory)
+    results = {}
+    serialized = []
+    for character in characters:
+        name = character.get("name")
+        try:
+            serialized.append((name, serialize_character(character), index_row(character)))
+        except Exception as e:
+            results[name] = e
+
+    save_many = getattr(backend, "save_many", None)
+    if save_many is not None:
+        error = _capture(save_many, serialized)
+        results.update((name, True if error is None else error) for name, _, _ in serialized)
+    else:
+        def save_chunk(chunk):
+            return [(name, _capture(backend.save, name, data, row) or True)
+                    for name, data, row in chunk]
+
+        results.update(_run_batches(save_chunk, serialized, workers))
+    for name, _, _ in serialized:
+        _invalidate_cached(save_directory, name)
+    return results
+
+
+def list_saved_characters(save_directory="data/save_games", after=None, limit=None):
+    """
+    Get list of all saved character names, sorted by name
+
+    For pagination pass the last name of the previous page as `after` and
+    a page size as `limit`.
+    """
+    return get_save_backend(save_directory).list_names(after, limit)
+
+
+def delete_character(character_name, save_directory="data/save_games"):
+    """
+    Delete a character's save file
+    """
+    try:
+        get_save_backend(save_directory).delete(character_name)
+    finally:
+        _invalidate_cached(save_directory, character_name)
+    return True
+
+
+def _load_from(backend, character_name):
+    return _parse_loaded(backend, character_name, backend.load(character_name))
 
-    if not os.path.exists(filepath):
-        raise CharacterNotFoundError(f"No save file found for '{character_name}'.")
 
+def _parse_loaded(backend, character_name, data):
     try:
-        with open(filepath, "r") as file:
-            lines = file.readlines()
+        return parse_character_save(data)
+    except InvalidSaveDataError:
+        # A torn write can be repaired from the save journal, if enabled
+        recover = getattr(backend, "recover", None)
+        recovered = recover(character_name) if recover else None
+        if recovered is None:
+            raise
+        return parse_character_save(recovered)
+
+
+def _capture(function, *args):
+    """Call function, returning the exception instead of raising it."""
+    try:
+        return function(*args)
     except Exception as e:
-        raise SaveFileCorruptedError(f"Could not read save file: {e}")
+        return e
+
+
+def _run_batches(process_chunk, items, workers):
+    """Run process_chunk over slices of items in a thread pool; merge results."""
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    chunk_size = max(1, -(-len(items) // (workers * 4)))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    results = {}
+    if len(chunks) <= 1:
+        for chunk in chunks:
+            results.update(process_chunk(chunk))
+        return results
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for pairs in executor.map(process_chunk, chunks):
+            results.update(pairs)
+    return results
+
+
+# ============================================================================
+# SAVE FORMAT
+# ============================================================================
+
+# Version 1 saves had no VERSION line and no equipment fields; version 2
+# had no inventory capacity; version 3 had no equipment bonuses; version 4
+# had only weapon and armor slots
+SAVE_VERSION = 5
+SAVE_FIELDS = [
+    ("NAME", "name"), ("CLASS", "class"), ("LEVEL", "level"),
+    ("HEALTH", "health"), ("MAX_HEALTH", "max_health"),
+    ("STRENGTH", "strength"), ("MAGIC", "magic"),
+    ("EXPERIENCE", "experience"), ("GOLD", "gold"),
+    ("INVENTORY", "inventory"), ("ACTIVE_QUESTS", "active_quests"),
+    ("COMPLETED_QUESTS", "completed_quests"),
+    ("EQUIPMENT", "equipment"),
+    ("INVENTORY_CAPACITY", "inventory_capacity"),
+    ("EQUIPMENT_BONUSES", "equipment_bonuses"),
+]
+SAVE_LIST_FIELDS = ("inventory", "active_quests", "completed_quests")
+SAVE_TEXT_FIELDS = ("name", "class")
+# {slot: item_id} fields, saved as "slot=item_id;slot=item_id"
+SAVE_SLOT_FIELDS = ("equipment",)
+# Values saved for fields a character dict may not have
+SAVE_DEFAULTS = {"inventory_capacity": MAX_INVENTORY_SIZE}
+# {slot: bonus vector} fields, saved as "slot=stat:value,stat:value;slot=..."
+SAVE_BONUS_FIELDS = ("equipment_bonuses",)
+
+# Compressed saves are recognised by the codec's magic bytes; plain text
+# saves always start with a KEY line
+SAVE_COMPRESSION = "none"
+SAVE_COMPRESSORS = {
+    "none": lambda data: data,
+    "zlib": lambda data: zlib.compress(data, 6),
+    "lzma": lambda data: lzma.compress(data),
+}
+ZLIB_MAGIC = (b"\x78\x01", b"\x78\x5e", b"\x78\x9c", b"\x78\xda")
+LZMA_MAGIC = b"\xfd7zXZ\x00"
+
+
+def _migrate_save_v1(values):
+    values.setdefault("EQUIPPED_WEAPON", "")
+    values.setdefault("EQUIPPED_ARMOR", "")
+    return values
+
+
+def _migrate_save_v2(values):
+    values.setdefault("INVENTORY_CAPACITY", str(MAX_INVENTORY_SIZE))
+    return values
+
 
-    data = {}
+def _migrate_save_v3(values):
+    # Older saves baked equipment into the stats without recording it; the
+    # missing bonuses are looked up in the registered item data on load
+    values.setdefault("EQUIPMENT_BONUSES", "")
+    return values
+
+
+def _migrate_save_v4(values):
+    equipment = {slot: values.pop(f"EQUIPPED_{slot.upper()}", "") for slot in MIRRORED_SLOTS}
+    values["EQUIPMENT"] = _format_slots(equipment)
+    return values
+
+
+# version -> function upgrading that version's {KEY: value} to the next one
+SAVE_MIGRATIONS = {
+    1: _migrate_save_v1,
+    2: _migrate_save_v2,
+    3: _migrate_save_v3,
+    4: _migrate_save_v4,
+}
+
+
+def serialize_character(character, compression=None):
+    """
+    Return the save file contents for a character as bytes, compressed
+    with `compression` ("none", "zlib", "lzma"; default SAVE_COMPRESSION).
+    """
+    content = [f"VERSION: {SAVE_VERSION}"]
+    for key, field in SAVE_FIELDS:
+        if field in SAVE_LIST_FIELDS:
+            value = ",".join(character.get(field, []))
+        elif field in SAVE_SLOT_FIELDS:
+            value = _format_slots(equipped_items(character))
+        elif field in SAVE_DEFAULTS:
+            value = character.get(field, SAVE_DEFAULTS[field])
+        elif field in SAVE_BONUS_FIELDS:
+            value = _format_bonuses(character.get(field, {}))
+        else:
+            value = character[field]
+        content.append(f"{key}: {value}")
+    data = "\n".join(content).encode("utf-8")
+    compressor = SAVE_COMPRESSORS.get(compression or SAVE_COMPRESSION)
+    if compressor is None:
+        raise ValueError(f"Unknown save compression: {compression}")
+    return compressor(data)
+
+
+def parse_character_save(data):
+    """
+    Build a character dict from save file contents (bytes or str), of any
+    known version, compressed or not.
+    Raises: InvalidSaveDataError
+    """
+    if isinstance(data, bytes):
+        try:
+            data = _decompress_save(data).decode("utf-8")
+        except (UnicodeDecodeError, zlib.error, lzma.LZMAError):
+            raise InvalidSaveDataError("Save file data format is invalid.")
+
+    values = {}
     try:
-        for line in lines:
+        for line in data.splitlines():
             if ":" not in line:
                 raise InvalidSaveDataError(f"Invalid line: {line}")
             key, value = line.strip().split(":", 1)
-            data[key.strip()] = value.strip()
+            values[key.strip()] = value.strip()
     except Exception:
         raise InvalidSaveDataError("Save file data format is invalid.")
 
-    required = [
-        "NAME", "CLASS", "LEVEL", "HEALTH", "MAX_HEALTH",
-        "STRENGTH", "MAGIC", "EXPERIENCE", "GOLD",
-        "INVENTORY", "ACTIVE_QUESTS", "COMPLETED_QUESTS"
-    ]
-    for field in required:
-        if field not in data:
-            raise InvalidSaveDataError(f"Missing field: {field}")
+    try:
+        version = int(values.pop("VERSION", 1))
+    except ValueError:
+        raise InvalidSaveDataError("Save file version must be an integer.")
+    if version > SAVE_VERSION:
+        raise InvalidSaveDataError(f"Save file version {version} is newer than supported.")
+    while version < SAVE_VERSION:
+        values = SAVE_MIGRATIONS[version](values)
+        version += 1
 
-    def parse_list(s):
-        return [] if s == "" else s.split(",")
+    for key, _ in SAVE_FIELDS:
+        if key not in values:
+            raise InvalidSaveDataError(f"Missing field: {key}")
 
-    character = {
-        "name": data["NAME"],
-        "class": data["CLASS"],
-        "level": int(data["LEVEL"]),
-        "health": int(data["HEALTH"]),
-        "max_health": int(data["MAX_HEALTH"]),
-        "strength": int(data["STRENGTH"]),
-        "magic": int(data["MAGIC"]),
-        "experience": int(data["EXPERIENCE"]),
-        "gold": int(data["GOLD"]),
-        "inventory": parse_list(data["INVENTORY"]),
-        "active_quests": parse_list(data["ACTIVE_QUESTS"]),
-        "completed_quests": parse_list(data["COMPLETED_QUESTS"])
-    }
+    character = {}
+    try:
+        for key, field in SAVE_FIELDS:
+            value = values[key]
+            if field in SAVE_LIST_FIELDS:
+                character[field] = [] if value == "" else value.split(",")
+                if field == "inventory":
+                    character[field] = Inventory(character[field])
+            elif field in SAVE_TEXT_FIELDS:
+                character[field] = value
+            elif field in SAVE_SLOT_FIELDS:
+                character[field] = _parse_slots(value)
+            elif field in SAVE_BONUS_FIELDS:
+                character[field] = _parse_bonuses(value)
+            else:
+                character[field] = int(value)
+    except ValueError:
+        if field in SAVE_SLOT_FIELDS + SAVE_BONUS_FIELDS:
+            raise InvalidSaveDataError(f"Field {key} is invalid.")
+        raise InvalidSaveDataError(f"Field {key} must be an integer.")
+    for slot in MIRRORED_SLOTS:
+        character[f"equipped_{slot}"] = character["equipment"].get(slot)
+    # Saved stats are effective values; base stats are those minus bonuses.
+    # Equipment without a stored bonus (older saves) needs the item data,
+    # so without it the base stats are derived on first use instead.
+    try:
+        get_base_stats(character)
+    except ItemNotFoundError:
+        pass
+    character["stats_version"] = 0
     return character
 
 
-def list_saved_characters(save_directory="data/save_games"):
+def _format_slots(slots):
+    return ";".join(f"{slot}={item_id}" for slot, item_id in slots.items() if item_id)
+
+
+def _parse_slots(value):
+    return dict(part.split("=", 1) for part in filter(None, value.split(";")))
+
+
+def _format_bonuses(bonuses):
+    return ";".join(
+        f"{slot}=" + ",".join(f"{stat}:{value}" for stat, value in zip(STAT_NAMES, vector) if value)
+        for slot, vector in bonuses.items()
+    )
+
+
+def _parse_bonuses(value):
+    bonuses = {}
+    for part in filter(None, value.split(";")):
+        slot, stats = part.split("=", 1)
+        vector = list(NO_BONUSES)
+        for effect in filter(None, stats.split(",")):
+            stat, amount = effect.split(":", 1)
+            # index() raises ValueError for an unknown stat
+            vector[STAT_NAMES.index(stat)] += int(amount)
+        bonuses[slot] = tuple(vector)
+    return bonuses
+
+
+def _decompress_save(data):
+    """Return plain save text bytes, decompressing if needed."""
+    if data[:2] in ZLIB_MAGIC:
+        return zlib.decompress(data)
+    if data[:6] == LZMA_MAGIC:
+        return lzma.decompress(data)
+    return data
+
+
+def _read_file(filepath):
+    # Raw os calls: one open/fstat/read/close per save on the load path
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        while len(data) < size:
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+    finally:
+        os.close(fd)
+
+
+def _remove_if_exists(filepath):
+    try:
+        os.remove(filepath)
+    except FileNotFoundError:
+        pass
+
+
+def _last_modified(paths):
+    """Return the newest st_mtime_ns among the paths that exist, or None."""
+    newest = None
+    for path in paths:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        if newest is None or mtime > newest:
+            newest = mtime
+    return newest
+
+
+def _split_save_lines(data):
+    """Map each KEY of serialized save data to its whole line."""
+    return {line.split(b":", 1)[0]: line for line in data.split(b"\n") if line}
+
+
+# ============================================================================
+# SAVE BACKENDS
+# ============================================================================
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+# "flat": every save in one directory; "sharded": two levels of hex prefix
+SAVE_LAYOUTS = ("flat", "sharded")
+DEFAULT_SAVE_LAYOUT = "flat"
+# Written by migrate_layout() so later processes keep using the new layout
+LAYOUT_MARKER = ".layout"
+
+# save location -> backend instance
+_save_backends = {}
+
+
+def get_save_backend(save_directory="data/save_games"):
     """
-    Get list of all saved character names
+    Return the storage backend for a save location. Paths ending in
+    .db/.sqlite/.sqlite3 use SQLite; anything else is a save directory.
     """
-    if not os.path.exists(save_directory):
-        return []
-    files = os.listdir(save_directory)
-    return [f.replace("_save.txt", "") for f in files if f.endswith("_save.txt")]
+    backend = _save_backends.get(save_directory)
+    if backend is None:
+        if save_directory.lower().endswith(SQLITE_EXTENSIONS):
+            backend = SQLiteSaveBackend(save_directory)
+        else:
+            backend = FileSaveBackend(save_directory)
+        _save_backends[save_directory] = backend
+    return backend
 
 
-def delete_character(character_name, save_directory="data/save_games"):
+def _read_layout_marker(save_directory):
+    """Return the layout recorded by migrate_layout(), or DEFAULT_SAVE_LAYOUT."""
+    try:
+        with open(os.path.join(save_directory, LAYOUT_MARKER)) as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        return DEFAULT_SAVE_LAYOUT
+
+
+def register_save_backend(save_directory, backend):
+    """Use a custom backend for every call made with this save location."""
+    _save_backends[save_directory] = backend
+    return backend
+
+
+def migrate_save_layout(save_directory="data/save_games", layout="sharded"):
     """
-    Delete a character's save file
+    Switch a save directory to another layout while the game keeps running:
+    new saves go to the new layout immediately and existing saves are moved
+    over. Loads find a save in either layout throughout, and the layout is
+    recorded in the directory so later runs keep using it.
+    Returns the number of characters moved.
+    """
+    return get_save_backend(save_directory).migrate_layout(layout)
+
+
+class FileSaveBackend:
+    """
+    Stores each character as <name>_save.txt in a directory.
+
+    Saves are written to a temp file and atomically renamed over the old
+    one, so a crash never leaves a half-written save. With journal=True
+    every save is first appended to an fsynced write-ahead journal that
+    recover()/replay_journal() can restore the last good state from.
+
+    With deltas=True a save only appends the lines that changed since the
+    last one to <name>_save.delta; after max_deltas of those the full state
+    is written as a new snapshot and the delta file is dropped. Any backend
+    applies existing delta files on load, and a deltas=False save of that
+    name replaces them.
+
+    layout="sharded" stores saves under two levels of hex prefix taken from
+    a hash of the name (e.g. 3f/a2/<name>_save.txt) so no directory grows
+    too large. Loads, listings and deletes understand both layouts. With
+    layout=None the layout last chosen by migrate_layout() (recorded in
+    <save_directory>/.layout) is used, or DEFAULT_SAVE_LAYOUT.
+
+    With index=True (the default) class, level, gold and experience of every
+    save are kept in a CharacterIndex stored in <save_directory>/.index.db.
+    Index updates are queued rather than written by each save, and applied
+    in one transaction by the next query, a write-behind flush, close(), or
+    once INDEX_BATCH are pending. An index a crash left behind its saves is
+    rebuilt on first use.
+    """
+
+    SUFFIX = "_save.txt"
+    JOURNAL_NAME = "save_journal.log"
+    # data length, crc32 of name + data, record kind, name length
+    JOURNAL_HEADER = struct.Struct("<IIBH")
+    JOURNAL_SAVE = 0
+    JOURNAL_DELETE = 1
+    DELTA_SUFFIX = "_save.delta"
+    # payload length, crc32 of payload, crc32 of the snapshot it applies to
+    DELTA_HEADER = struct.Struct("<III")
+    INDEX_NAME = ".index.db"
+    INDEX_BATCH = 1000
+
+    def __init__(self, save_directory, fsync=True, journal=False,
+                 max_journal_bytes=64 * 1024 * 1024, deltas=False, max_deltas=32,
+                 layout=None, index=True):
+        if layout is None:
+            layout = _read_layout_marker(save_directory)
+        if layout not in SAVE_LAYOUTS:
+            raise ValueError(f"Unknown save layout: {layout}")
+        self.save_directory = save_directory
+        self.layout = layout
+        self.fsync = fsync
+        self.journal = journal
+        self.max_journal_bytes = max_journal_bytes
+        self.deltas = deltas
+        self.max_deltas = max_deltas
+        self.journal_path = os.path.join(save_directory, self.JOURNAL_NAME)
+        self._directory_ready = False
+        self._journal_fd = None
+        self._journal_lock = threading.Lock()
+        # name -> [{key: line}, snapshot crc32, delta count]
+        self._delta_state = {}
+        # Names with delta files left by another backend (deltas=False only)
+        self._stale_deltas = None
+        self._delta_lock = threading.Lock()
+        # Held while a snapshot is renamed into place and while the layout
+        # changes, so no save lands in a layout a migration already emptied
+        self._layout_lock = threading.Lock()
+        self.index = index
+        self._character_index = None
+        self._index_lock = threading.Lock()
+        # name -> index row, or None for a deleted save
+        self._pending_index = {}
+        self._pending_lock = threading.Lock()
+        self._index_marked = False
+
+    def save_path(self, name, layout=None):
+        return os.path.join(self._directory_for(name, layout), f"{name}{self.SUFFIX}")
+
+    def delta_path(self, name, layout=None):
+        return os.path.join(self._directory_for(name, layout), f"{name}{self.DELTA_SUFFIX}")
+
+    def save(self, name, data, index_row=None):
+        if not self._directory_ready:
+            os.makedirs(self.save_directory, exist_ok=True)
+            self._directory_ready = True
+        if self.journal:
+            self._append_journal(self.JOURNAL_SAVE, name, data)
+        if self.deltas:
+            with self._delta_lock:
+                self._save_delta(name, data)
+        else:
+            self._write_snapshot(name, data)
+            with self._delta_lock:
+                if name in self._delta_names():
+                    # Written by a deltas=True backend; the new snapshot
+                    # supersedes them
+                    _remove_if_exists(self.delta_path(name, self._other_layout()))
+                    self._drop_deltas(name)
+                    self._stale_deltas.discard(name)
+        if self.index and index_row is not None:
+            self._queue_index(name, tuple(index_row))
+
+    def load(self, name):
+        for layout in (self.layout, self._other_layout()):
+            try:
+                return self._read_save(name, layout)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                raise SaveFileCorruptedError(f"Could not read save file: {e}")
+        if self.journal:
+            recovered = self.recover(name)
+            if recovered is not None:
+                return recovered
+        raise CharacterNotFoundError(f"No save file found for '{name}'.")
+
+    def delete(self, name):
+        paths = [self.save_path(name, layout) for layout in SAVE_LAYOUTS]
+        paths = [path for path in paths if os.path.exists(path)]
+        if not paths:
+            raise CharacterNotFoundError(f"No save file found for '{name}'.")
+        if self.journal:
+            self._append_journal(self.JOURNAL_DELETE, name, b"")
+        with self._delta_lock:
+            self._drop_deltas(name)
+            _remove_if_exists(self.delta_path(name, self._other_layout()))
+            for path in paths:
+                os.remove(path)
+        if self.index:
+            self._queue_index(name, None)
+
+    def list_names(self, after=None, limit=None):
+        flat, sharded = self._scan_names()
+        names = sorted(flat | sharded)
+        if after is not None:
+            names = [name for name in names if name > after]
+        return names if limit is None else names[:limit]
+
+    def recover(self, name):
+        """
+        Restore a character's save from the journal's last good record.
+        Returns the recovered data, or None if there is nothing to restore.
+        """
+        if not self.journal:
+            return None
+        data = self._read_journal().get(name)
+        if data is None:
+            return None
+        self._restore(name, data)
+        return data
+
+    def replay_journal(self):
+        """
+        Rewrite every save whose file differs from its last journaled state
+        (e.g. after a crash). Returns the sorted list of restored names.
+        """
+        restored = []
+        for name, data in self._read_journal().items():
+            if data is None:
+                continue
+            try:
+                if self._read_save(name) == data:
+                    continue
+            except OSError:
+                pass
+            self._restore(name, data)
+            restored.append(name)
+        return sorted(restored)
+
+    def compact_journal(self):
+        """Rewrite the journal keeping only the latest record per name."""
+        with self._journal_lock:
+            latest = self._read_journal()
+            self._close_journal()
+            temp_path = self.journal_path + ".tmp"
+            with open(temp_path, "wb") as file:
+                for name, data in latest.items():
+                    if data is not None:
+                        file.write(self._journal_record(self.JOURNAL_SAVE, name, data))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.journal_path)
+
+    def migrate_layout(self, layout):
+        """
+        Send new saves to `layout`, record it in the save directory and move
+        existing saves into it. If a name has a copy in both layouts the
+        more recently written one is kept. Returns the number moved.
+        """
+        if layout not in SAVE_LAYOUTS:
+            raise ValueError(f"Unknown save layout: {layout}")
+        os.makedirs(self.save_directory, exist_ok=True)
+        with self._delta_lock, self._layout_lock:
+            self._write_atomic(os.path.join(self.save_directory, LAYOUT_MARKER),
+                               layout.encode("ascii"))
+            self.layout = layout
+            self._delta_state.clear()
+        old_layout = self._other_layout()
+        flat, sharded = self._scan_names()
+        moved = 0
+        for name in sorted(sharded if old_layout == "sharded" else flat):
+            with self._delta_lock, self._layout_lock:
+                if self._move_save(name, old_layout):
+                    moved += 1
+        return moved
+
+    def character_index(self):
+        """
+        Return the CharacterIndex for this directory, opening it on first
+        use, with every queued update applied.
+        """
+        self.flush_index()
+        return self._open_index()
+
+    def flush_index(self):
+        """Apply queued index updates in one transaction."""
+        with self._index_lock:
+            with self._pending_lock:
+                pending, self._pending_index = self._pending_index, {}
+            if pending:
+                self._open_index_unlocked().apply(pending)
+
+    def _queue_index(self, name, row):
+        if not self._index_marked:
+            # Until close() the index may lag the saves; a crash before
+            # then leaves it marked for a rebuild
+            self._index_marked = True
+            self._open_index().mark_dirty()
+            atexit.register(self.close)
+        with self._pending_lock:
+            self._pending_index[name] = row
+            full = len(self._pending_index) >= self.INDEX_BATCH
+        if full:
+            self.flush_index()
+
+    def _open_index(self):
+        with self._index_lock:
+            return self._open_index_unlocked()
+
+    def _open_index_unlocked(self):
+        if self._character_index is None:
+            os.makedirs(self.save_directory, exist_ok=True)
+            connection = sqlite3.connect(os.path.join(self.save_directory, self.INDEX_NAME),
+                                         check_same_thread=False)
+            # The saves are the source of truth; the index can be rebuilt
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._character_index = CharacterIndex(connection, threading.Lock())
+        return self._character_index
+
+    def close(self):
+        with self._journal_lock:
+            self._close_journal()
+        self.flush_index()
+        with self._index_lock:
+            if self._character_index is not None:
+                if self._index_marked:
+                    self._character_index.mark_clean()
+                    self._index_marked = False
+                self._character_index.close()
+                self._character_index = None
+
+    def _directory_for(self, name, layout=None):
+        if (layout or self.layout) == "flat":
+            return self.save_directory
+        prefix = f"{zlib.crc32(name.encode('utf-8')):08x}"
+        return os.path.join(self.save_directory, prefix[:2], prefix[2:4])
+
+    def _other_layout(self):
+        return "flat" if self.layout == "sharded" else "sharded"
+
+    def _scan_names(self, suffix=None):
+        """Return (flat names, sharded names) of every save (or suffix file) on disk."""
+        suffix = suffix or self.SUFFIX
+        flat, sharded = set(), set()
+        try:
+            top = list(os.scandir(self.save_directory))
+        except FileNotFoundError:
+            return flat, sharded
+        for entry in top:
+            if entry.name.endswith(suffix):
+                flat.add(entry.name[:-len(suffix)])
+            elif len(entry.name) == 2 and entry.is_dir():
+                for middle in os.scandir(entry.path):
+                    if middle.is_dir():
+                        sharded.update(f[:-len(suffix)] for f in os.listdir(middle.path)
+                                       if f.endswith(suffix))
+        return flat, sharded
+
+    def _read_save(self, name, layout=None):
+        """
+        Return the snapshot with any delta records applied. Deltas are read
+        whatever this backend's deltas setting, which only decides how saves
+        are written.
+        """
+        snapshot = _read_file(self.save_path(name, layout))
+        # Deltas are computed over plain text
+        plain = _decompress_save(snapshot)
+        payloads = self._read_deltas(name, plain, layout)
+        if not payloads:
+            return snapshot
+        snapshot = plain
+        if not self.deltas:
+            with self._delta_lock:
+                self._delta_names().add(name)
+        fields = _split_save_lines(snapshot)
+        for payload in payloads:
+            fields.update(_split_save_lines(payload))
+        return b"\n".join(fields.values())
+
+    def _restore(self, name, data):
+        with self._delta_lock:
+            self._write_snapshot(name, data)
+            self._drop_deltas(name)
+        if self.index:
+            try:
+                row = index_row(parse_character_save(data))
+            except InvalidSaveDataError:
+                return
+            self._queue_index(name, tuple(row))
+
+    def _write_snapshot(self, name, data):
+        try:
+            temp_path = self._write_temp(self.save_path(name), data)
+        except FileNotFoundError:
+            # New shard directory (or one removed behind our back)
+            if os.path.isdir(self._directory_for(name)):
+                raise
+            os.makedirs(self._directory_for(name), exist_ok=True)
+            temp_path = self._write_temp(self.save_path(name), data)
+        try:
+            # The path is chosen again under the lock: the layout may have
+            # changed while the temp file was written
+            with self._layout_lock:
+                path = self.save_path(name)
+                try:
+                    os.replace(temp_path, path)
+                except FileNotFoundError:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    os.replace(temp_path, path)
+        except BaseException:
+            _remove_if_exists(temp_path)
+            raise
+
+    def _move_save(self, name, old_layout):
+        """
+        Move a save and its deltas from old_layout to the current layout.
+        If both layouts hold a copy the older one is removed. Returns True
+        if the old copy was moved.
+        """
+        old_paths = (self.delta_path(name, old_layout), self.save_path(name, old_layout))
+        new_paths = (self.delta_path(name), self.save_path(name))
+        old_time = _last_modified(old_paths)
+        if old_time is None:
+            return False
+        new_time = _last_modified(new_paths)
+        if new_time is not None and new_time >= old_time:
+            for path in old_paths:
+                _remove_if_exists(path)
+            return False
+        os.makedirs(self._directory_for(name), exist_ok=True)
+        # Deltas first, so a load never pairs a moved snapshot with deltas
+        # that were left behind
+        if os.path.exists(old_paths[0]):
+            os.replace(old_paths[0], new_paths[0])
+        else:
+            _remove_if_exists(new_paths[0])
+        os.replace(old_paths[1], new_paths[1])
+        return True
+
+    def _save_delta(self, name, data):
+        data = _decompress_save(data)
+        fields = _split_save_lines(data)
+        state = self._delta_state.get(name)
+        if state is None:
+            state = self._load_delta_state(name)
+        if state is None or state[2] >= self.max_deltas or state[0].keys() - fields.keys():
+            # Compact: the full state becomes the new snapshot
+            self._write_snapshot(name, data)
+            self._drop_deltas(name)
+            self._delta_state[name] = [fields, zlib.crc32(data), 0]
+            return
+
+        previous = state[0]
+        changed = b"\n".join(line for key, line in fields.items() if previous.get(key) != line)
+        if not changed:
+            return
+        record = self.DELTA_HEADER.pack(len(changed), zlib.crc32(changed), state[1]) + changed
+        fd = os.open(self.delta_path(name), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, record)
+            if self.fsync and not self.journal:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        state[0] = fields
+        state[2] += 1
+
+    def _load_delta_state(self, name):
+        try:
+            with open(self.save_path(name), "rb") as file:
+                snapshot = _decompress_save(file.read())
+        except FileNotFoundError:
+            return None
+        fields = _split_save_lines(snapshot)
+        payloads = self._read_deltas(name, snapshot)
+        for payload in payloads:
+            fields.update(_split_save_lines(payload))
+        return [fields, zlib.crc32(snapshot), len(payloads)]
+
+    def _read_deltas(self, name, snapshot, layout=None):
+        """
+        Return the delta payloads that apply to this snapshot, stopping at
+        a torn or corrupted record. Deltas left over from an older snapshot
+        (a crash between compaction and cleanup) are ignored.
+        """
+        try:
+            with open(self.delta_path(name, layout), "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            return []
+
+        base = zlib.crc32(snapshot)
+        header_size = self.DELTA_HEADER.size
+        payloads = []
+        position = 0
+        while position + header_size <= len(content):
+            length, checksum, snapshot_crc = self.DELTA_HEADER.unpack_from(content, position)
+            start = position + header_size
+            payload = content[start:start + length]
+            if len(payload) != length or zlib.crc32(payload) != checksum:
+                break
+            if snapshot_crc == base:
+                payloads.append(payload)
+            position = start + length
+        return payloads
+
+    def _drop_deltas(self, name):
+        self._delta_state.pop(name, None)
+        _remove_if_exists(self.delta_path(name))
+
+    def _delta_names(self):
+        """Names with a delta file on disk, scanned once (for deltas=False)."""
+        if self._stale_deltas is None:
+            flat, sharded = self._scan_names(self.DELTA_SUFFIX)
+            self._stale_deltas = flat | sharded
+        return self._stale_deltas
+
+    def _write_atomic(self, filepath, data):
+        temp_path = self._write_temp(filepath, data)
+        try:
+            os.replace(temp_path, filepath)
+        except BaseException:
+            _remove_if_exists(temp_path)
+            raise
+
+    def _write_temp(self, filepath, data):
+        """Write data to a temp file next to filepath; returns its path."""
+        # Raw os calls avoid the extra fstat/ioctl/lseek of open(), which
+        # pays for the fsync + rename on the hot path. The temp file is
+        # per process and thread, so concurrent saves of one name never
+        # share (and truncate) each other's temp file.
+        temp_path = f"{filepath}.{os.getpid()}-{threading.get_ident()}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                # With a journal the fsynced journal record is the durable copy
+                if self.fsync and not self.journal:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+        except BaseException:
+            _remove_if_exists(temp_path)
+            raise
+        return temp_path
+
+    def _journal_record(self, kind, name, data):
+        name_bytes = name.encode("utf-8")
+        checksum = zlib.crc32(name_bytes + data)
+        header = self.JOURNAL_HEADER.pack(len(data), checksum, kind, len(name_bytes))
+        return header + name_bytes + data
+
+    def _append_journal(self, kind, name, data):
+        record = self._journal_record(kind, name, data)
+        with self._journal_lock:
+            if self._journal_fd is None:
+                self._open_journal()
+            os.write(self._journal_fd, record)
+            os.fsync(self._journal_fd)
+            too_big = os.fstat(self._journal_fd).st_size > self.max_journal_bytes
+        if too_big:
+            self.compact_journal()
+
+    def _open_journal(self):
+        # Drop a torn record left by a crash so new records stay readable
+        valid_size = self._scan_journal()[1]
+        self._journal_fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(self._journal_fd).st_size != valid_size:
+            os.ftruncate(self._journal_fd, valid_size)
+
+    def _close_journal(self):
+        if self._journal_fd is not None:
+            os.close(self._journal_fd)
+            self._journal_fd = None
+
+    def _read_journal(self):
+        return self._scan_journal()[0]
+
+    def _scan_journal(self):
+        """
+        Return ({name: latest data, or None if deleted}, valid byte size).
+        Reading stops at the first torn or corrupted record.
+        """
+        latest = {}
+        try:
+            with open(self.journal_path, "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            return latest, 0
+
+        header_size = self.JOURNAL_HEADER.size
+        position = 0
+        while position + header_size <= len(content):
+            length, checksum, kind, name_length = self.JOURNAL_HEADER.unpack_from(content, position)
+            start = position + header_size
+            end = start + name_length + length
+            if end > len(content):
+                break
+            name_bytes = content[start:start + name_length]
+            data = content[start + name_length:end]
+            if zlib.crc32(name_bytes + data) != checksum:
+                break
+            latest[name_bytes.decode("utf-8")] = data if kind == self.JOURNAL_SAVE else None
+            position = end
+        return latest, position
+
+
+class SQLiteSaveBackend:
+    """
+    Stores every character in one SQLite database, keyed by name, so
+    lookups and paged listings use the primary key index instead of a
+    directory scan. The CharacterIndex table lives in the same database
+    and is updated in the same transaction as the save.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS characters ("
+                "name TEXT PRIMARY KEY, data BLOB NOT NULL)"
+            )
+        self._character_index = CharacterIndex(self._connection, self._lock)
+
+    def save(self, name, data, index_row=None):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO characters (name, data) VALUES (?, ?)",
+                (name, data),
+            )
+            if index_row is not None:
+                self._character_index.put_unlocked([(name, *index_row)])
+
+    def save_many(self, items):
+        """Save (name, data, index row or None) triples in a single transaction."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO characters (name, data) VALUES (?, ?)",
+                [(name, data) for name, data, _ in items],
+            )
+            self._character_index.put_unlocked(
+                [(name, *row) for name, _, row in items if row is not None])
+
+    def load_many(self, names, batch_size=500):
+        """Return {name: data, or CharacterNotFoundError} for many names."""
+        found = {}
+        try:
+            with self._lock:
+                for i in range(0, len(names), batch_size):
+                    batch = names[i:i + batch_size]
+                    placeholders = ",".join("?" * len(batch))
+                    found.update(self._connection.execute(
+                        f"SELECT name, data FROM characters WHERE name IN ({placeholders})",
+                        batch,
+                    ))
+        except sqlite3.DatabaseError as e:
+            error = SaveFileCorruptedError(f"Could not read save database: {e}")
+            return {name: error for name in names}
+        return {name: found[name] if name in found
+                else CharacterNotFoundError(f"No save file found for '{name}'.")
+                for name in names}
+
+    def load(self, name):
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT data FROM characters WHERE name = ?", (name,)
+                ).fetchone()
+        except sqlite3.DatabaseError as e:
+            raise SaveFileCorruptedError(f"Could not read save database: {e}")
+        if row is None:
+            raise CharacterNotFoundError(f"No save file found for '{name}'.")
+        return row[0]
+
+    def delete(self, name):
+        with self._lock, self._connection:
+            deleted = self._connection.execute(
+                "DELETE FROM characters WHERE name = ?", (name,)
+            ).rowcount
+            self._character_index.remove_unlocked(name)
+        if not deleted:
+            raise CharacterNotFoundError(f"No save file found for '{name}'.")
+
+    def list_names(self, after=None, limit=None):
+        query = "SELECT name FROM characters"
+        params = []
+        if after is not None:
+            query += " WHERE name > ?"
+            params.append(after)
+        query += " ORDER BY name"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._connection.execute(query, params)]
+
+    def character_index(self):
+        return self._character_index
+
+    def recover(self, name):
+        # SQLite transactions are already atomic; nothing to replay
+        return None
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+# ============================================================================
+# SECONDARY INDEXES
+# ============================================================================
+
+INDEX_COLUMNS = ("class", "level", "gold", "experience")
+INDEX_SORT_COLUMNS = ("level", "gold", "experience")
+
+
+def index_row(character):
+    """Return the indexed values of a character, in INDEX_COLUMNS order."""
+    return tuple(character[column] for column in INDEX_COLUMNS)
+
+
+class CharacterIndex:
+    """
+    SQLite table of (name, class, level, gold, experience) with indexes for
+    class/level filters and top-k by level, gold or experience, so those
+    queries never open individual saves. *_unlocked methods are for callers
+    already holding the lock inside a transaction.
+    """
+
+    def __init__(self, connection, lock):
+        self._connection = connection
+        self._lock = lock
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS character_index ("
+                "name TEXT PRIMARY KEY, class TEXT NOT NULL, level INTEGER NOT NULL, "
+                "gold INTEGER NOT NULL, experience INTEGER NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS character_index_class_level "
+                "ON character_index (class, level)")
+            for column in INDEX_SORT_COLUMNS:
+                self._connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS character_index_{column} "
+                    f"ON character_index ({column})")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS character_index_state ("
+                "key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            empty = self._connection.execute(
+                "SELECT 1 FROM character_index LIMIT 1").fetchone() is None
+            dirty = self._connection.execute(
+                "SELECT value FROM character_index_state WHERE key = 'dirty'").fetchone()
+            self.needs_rebuild = empty or bool(dirty and dirty[0])
+
+    def put(self, rows):
+        with self._lock, self._connection:
+            self.put_unlocked(rows)
+
+    def put_unlocked(self, rows):
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO character_index "
+            "(name, class, level, gold, experience) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def remove(self, name):
+        with self._lock, self._connection:
+            self.remove_unlocked(name)
+
+    def remove_unlocked(self, name):
+        self._connection.execute("DELETE FROM character_index WHERE name = ?", (name,))
+
+    def apply(self, changes):
+        """Apply {name: row, or None to remove} in one transaction."""
+        with self._lock, self._connection:
+            self.put_unlocked([(name, *row) for name, row in changes.items() if row is not None])
+            self._connection.executemany(
+                "DELETE FROM character_index WHERE name = ?",
+                [(name,) for name, row in changes.items() if row is None])
+
+    def mark_dirty(self):
+        """Record that the saves may be ahead of the index until mark_clean()."""
+        self._set_state("dirty", 1)
+
+    def mark_clean(self):
+        self._set_state("dirty", 0)
+
+    def replace_all(self, rows):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM character_index")
+            self.put_unlocked(rows)
+        self.needs_rebuild = False
+
+    def _set_state(self, key, value):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO character_index_state (key, value) VALUES (?, ?)",
+                (key, value))
+
+    def find(self, character_class=None, ranges=None, limit=None):
+        """
+        Return sorted names matching character_class and every
+        {column: (minimum or None, maximum or None)} range.
+        """
+        conditions, params = [], []
+        if character_class is not None:
+            conditions.append("class = ?")
+            params.append(character_class)
+        for column, (minimum, maximum) in (ranges or {}).items():
+            if column not in INDEX_SORT_COLUMNS:
+                raise ValueError(f"Not an indexed column: {column}")
+            if minimum is not None:
+                conditions.append(f"{column} >= ?")
+                params.append(minimum)
+            if maximum is not None:
+                conditions.append(f"{column} <= ?")
+                params.append(maximum)
+        query = "SELECT name FROM character_index"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY name"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._connection.execute(query, params)]
+
+    def top(self, by, limit, character_class=None):
+        """Return [(name, value)] for the highest `by` values, ties by name."""
+        if by not in INDEX_SORT_COLUMNS:
+            raise ValueError(f"Not an indexed column: {by}")
+        query = f"SELECT name, {by} FROM character_index"
+        params = []
+        if character_class is not None:
+            query += " WHERE class = ?"
+            params.append(character_class)
+        query += f" ORDER BY {by} DESC, name LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [tuple(row) for row in self._connection.execute(query, params)]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def rebuild_character_index(save_directory="data/save_games"):
+    """
+    Rebuild the index from the saves themselves (e.g. for a directory saved
+    before indexing existed). Returns the number of characters indexed.
+    """
+    backend = get_save_backend(save_directory)
+    loaded = load_characters(backend.list_names(), save_directory)
+    rows = [(name, *index_row(character)) for name, character in loaded.items()
+            if not isinstance(character, Exception)]
+    backend.character_index().replace_all(rows)
+    return len(rows)
+
+
+def find_characters(save_directory="data/save_games", character_class=None,
+                    min_level=None, max_level=None, min_gold=None, max_gold=None,
+                    min_experience=None, max_experience=None, limit=None):
+    """
+    Return the sorted names of saved characters matching every filter given,
+    answered from the index without loading any save.
     """
-    filepath = os.path.join(save_directory, f"{character_name}_save.txt")
-    if not os.path.exists(filepath):
-        raise CharacterNotFoundError(f"No save file found for '{character_name}'.")
-    os.remove(filepath)
+    ranges = {
+        "level": (min_level, max_level),
+        "gold": (min_gold, max_gold),
+        "experience": (min_experience, max_experience),
+    }
+    return _ready_index(save_directory).find(character_class, ranges, limit)
+
+
+def top_characters(by="gold", limit=100, save_directory="data/save_games", character_class=None):
+    """Return [(name, value)] of the top `limit` characters by level, gold or experience."""
+    return _ready_index(save_directory).top(by, limit, character_class)
+
+
+def _ready_index(save_directory):
+    index = get_save_backend(save_directory).character_index()
+    if index.needs_rebuild:
+        # Index created over existing saves, or left stale by a crash:
+        # fill it in from the saves once
+        if list_saved_characters(save_directory, limit=1):
+            rebuild_character_index(save_directory)
+        index.needs_rebuild = False
+    return index
+
+
+# ============================================================================
+# CHARACTER CACHE
+# ============================================================================
+
+class CharacterCache:
+    """
+    LRU cache of loaded characters keyed by (save location, name), bounded
+    by entry count and/or total save size in bytes, with an optional TTL
+    in seconds. get() returns a copy so callers can't alter cached state.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # Bumped on every invalidation so a load that raced a save isn't cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+        # key -> (character, size, expiry time or None)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy_character(entry[0])
+
+    def put(self, key, character, size, generation=None):
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (_copy_character(character), size, expires)
+            self.bytes += size
+            while (len(self._entries) > self.max_entries
+                   or (self.max_bytes is not None and self.bytes > self.max_bytes)):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self.generation += 1
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+
+_character_cache = None
+
+
+def enable_character_cache(max_entries=1024, max_bytes=None, ttl=None):
+    """Cache load_character() results in memory; returns the cache."""
+    global _character_cache
+    _character_cache = CharacterCache(max_entries, max_bytes, ttl)
+    return _character_cache
+
+
+def disable_character_cache():
+    global _character_cache
+    _character_cache = None
+
+
+def get_character_cache_stats():
+    """Return hit/miss/eviction counters, or None if caching is disabled."""
+    cache = _character_cache
+    return None if cache is None else cache.stats()
+
+
+def _invalidate_cached(save_directory, character_name):
+    cache = _character_cache
+    if cache is not None:
+        cache.invalidate((save_directory, character_name))
+
+
+def _copy_character(character):
+    # Characters hold scalars, lists, and dicts of scalars or of dicts
+    return {key: _copy_value(value) for key, value in character.items()}
+
+
+def _copy_value(value):
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    return value.copy() if hasattr(value, "copy") else value
+
+
+# ============================================================================
+# ASYNC API
+# ============================================================================
+
+# Upper bound on threads doing blocking save I/O for asyncio callers
+ASYNC_IO_WORKERS = 8
+
+_async_executor = None
+_async_executor_lock = threading.Lock()
+
+
+def _get_async_executor():
+    global _async_executor
+    with _async_executor_lock:
+        if _async_executor is None:
+            _async_executor = ThreadPoolExecutor(max_workers=ASYNC_IO_WORKERS,
+                                                 thread_name_prefix="save-io")
+        return _async_executor
+
+
+async def async_save_character(character, save_directory="data/save_games"):
+    """
+    Async version of save_character(). The character is serialized right
+    away so later changes made on the event loop can't race the write.
+    """
+    data = serialize_character(character)
+    backend = get_save_backend(save_directory)
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(_get_async_executor(), backend.save, character["name"], data,
+                                   index_row(character))
+    finally:
+        _invalidate_cached(save_directory, character["name"])
     return True
 
 
+async def async_load_character(character_name, save_directory="data/save_games"):
+    """Async version of load_character(); raises the same exceptions."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_async_executor(), load_character,
+                                      character_name, save_directory)
+
+
+async def async_list_saved_characters(save_directory="data/save_games", after=None, limit=None):
+    """Async version of list_saved_characters()."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_async_executor(), list_saved_characters,
+                                      save_directory, after, limit)
+
+
+# ============================================================================
+# WRITE-BEHIND SAVING
+# ============================================================================
+
+class WriteBehindSaver:
+    """
+    Coalesces frequent saves into occasional background writes.
+
+    mark_dirty() snapshots a character; a background thread writes it with
+    save_character() once it has been quiet for flush_interval seconds, and
+    never later than max_staleness seconds after it first became dirty.
+    Call flush() (e.g. on quit or death) to write everything immediately.
+    """
+
+    def __init__(self, save_directory="data/save_games", flush_interval=2.0, max_staleness=10.0):
+        self.save_directory = save_directory
+        self.flush_interval = flush_interval
+        self.max_staleness = max(max_staleness, 0.0)
+        self.last_error = None
+        self.writes = 0
+        # name -> [snapshot, first dirty time, last dirty time]
+        self._dirty = {}
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopping = False
+
+    def mark_dirty(self, character):
+        """Record the character's current state to be saved soon."""
+        snapshot = copy.deepcopy(character)
+        now = time.monotonic()
+        with self._condition:
+            entry = self._dirty.get(snapshot["name"])
+            if entry is None:
+                self._dirty[snapshot["name"]] = [snapshot, now, now]
+            else:
+                entry[0] = snapshot
+                entry[2] = now
+            self._start()
+            self._condition.notify()
+
+    def is_dirty(self, character_name):
+        with self._condition:
+            return character_name in self._dirty
+
+    def flush(self, character_name=None):
+        """
+        Write pending saves now (all of them, or just one character).
+        Returns the number of characters written.
+        """
+        with self._condition:
+            if character_name is None:
+                names = list(self._dirty)
+            else:
+                names = [character_name] if character_name in self._dirty else []
+        return self._write(names, raise_errors=True)
+
+    def close(self):
+        """Stop the background thread after a final flush."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        with self._condition:
+            self._stopping = False
+
+    def _start(self):
+        if self._thread is None and not self._stopping:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _due_time(self, entry):
+        return min(entry[2] + self.flush_interval, entry[1] + self.max_staleness)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                now = time.monotonic()
+                due = [name for name, entry in self._dirty.items() if self._due_time(entry) <= now]
+                if not due:
+                    next_due = min((self._due_time(entry) for entry in self._dirty.values()), default=None)
+                    self._condition.wait(None if next_due is None else next_due - now)
+                    continue
+            self._write(due, raise_errors=False)
+
+    def _write(self, names, raise_errors):
+        written = 0
+        for name in names:
+            with self._condition:
+                entry = self._dirty.get(name)
+                if entry is None:
+                    continue
+                snapshot = entry[0]
+            try:
+                save_character(snapshot, self.save_directory)
+            except Exception as e:
+                # Stays dirty so the next flush retries it
+                with self._condition:
+                    self.last_error = e
+                if raise_errors:
+                    raise
+                time.sleep(min(self.flush_interval, 1.0))
+                continue
+            written += 1
+            with self._condition:
+                # Only clean if nobody marked a newer snapshot meanwhile
+                if self._dirty.get(name) is entry and entry[0] is snapshot:
+                    del self._dirty[name]
+        if written:
+            # The index updates of the whole batch go in one transaction
+            flush_index = getattr(get_save_backend(self.save_directory), "flush_index", None)
+            if flush_index is not None:
+                flush_index()
+        with self._condition:
+            self.writes += written
+        return written
+
+
 # ============================================================================
 # CHARACTER OPERATIONS
 # ============================================================================
@@ -211,9 +1713,9 @@ def gain_experience(character, xp_amount):
     while character["experience"] >= character["level"] * 100:
         character["experience"] -= character["level"] * 100
         character["level"] += 1
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
+        adjust_base_stat(character, "max_health", 10)
+        adjust_base_stat(character, "strength", 2)
+        adjust_base_stat(character, "magic", 2)
         character["health"] = character["max_health"]
 
 
@@ -262,7 +1764,7 @@ def validate_character_data(character):
 
     list_fields = ["inventory", "active_quests", "completed_quests"]
     for field in list_fields:
-        if not isinstance(character[field], list):
+        if not isinstance(character[field], (list, Inventory)):
             raise InvalidSaveDataError(f"Field {field} must be a list.")
 
     return True
@@ -274,9 +1776,29 @@ __all__ = [
     "CharacterDeadError",
     "create_character",
     "load_character",
+    "load_characters",
+    "save_characters",
+    "enable_character_cache",
+    "disable_character_cache",
+    "get_character_cache_stats",
+    "async_save_character",
+    "async_load_character",
+    "async_list_saved_characters",
     "save_character",
     "list_saved_characters",
     "delete_character",
+    "serialize_character",
+    "parse_character_save",
+    "get_save_backend",
+    "register_save_backend",
+    "migrate_save_layout",
+    "find_characters",
+    "top_characters",
+    "rebuild_character_index",
+    "FileSaveBackend",
+    "SQLiteSaveBackend",
+    "WriteBehindSaver",
+    "CharacterCache",
     "gain_experience",
     "add_gold",
     "heal_character",
@@ -16,6 +16,7 @@ from custom_exceptions import (
     AbilityOnCooldownError
 )
 import random
+from inventory_system import adjust_base_stat
 
 # ============================================================================
 # ENEMY DEFINITIONS
@@ -59,7 +60,7 @@ def gain_experience(character, xp):
     while character["experience"] >= 100:
         character["experience"] -= 100
         character["level"] += 1
-        character["max_health"] += 10
+        adjust_base_stat(character, "max_health", 10)
         character["health"] = character["max_health"]
         display_battle_log(f"{character['name']} leveled up to {character['level']}!")
 
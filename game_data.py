@@ -10,41 +10,239 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import glob
+import hashlib
+import json
+import mmap
+import pickle
+import re
+import struct
+import sys
+import threading
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # columnar tables fall back to array.array
+    np = None
 from custom_exceptions import (
+    DataError,
     InvalidDataFormatError,
     MissingDataFileError,
     CorruptedDataError
 )
 
+# Field layout shared by the parsers, validators and record types
+QUEST_FIELDS = ("quest_id", "title", "description", "reward_xp",
+                "reward_gold", "required_level", "prerequisite")
+QUEST_NUMERIC_FIELDS = ("reward_xp", "reward_gold", "required_level")
+ITEM_FIELDS = ("item_id", "name", "type", "effect", "cost", "description")
+# Optional item fields and their defaults (STACK_SIZE: copies per inventory
+# slot; SLOT: equipment slot, "" meaning the slot named after the item type)
+ITEM_OPTIONAL_FIELDS = {"stack_size": 1, "slot": ""}
+ITEM_ALL_FIELDS = ITEM_FIELDS + tuple(ITEM_OPTIONAL_FIELDS)
+ITEM_NUMERIC_FIELDS = ("cost", "stack_size")
+ITEM_TYPES = frozenset(["weapon", "armor", "consumable"])
+# Stats an item effect may change, in the order of Item.bonuses vectors
+EFFECT_STATS = ("health", "max_health", "strength", "magic")
+# One or more stat:value pairs, e.g. "strength:5,magic:3"
+EFFECT_FORMAT = re.compile(r"[^:,]*:[0-9]+(?:,[^:,]*:[0-9]+)*")
+SLOT_FORMAT = re.compile(r"\w+")
+
+# Bump when the cached record layout changes so old caches are ignored
+CACHE_VERSION = 4
+
+# Packed item catalog layout: magic, record count, index offset, then the
+# source file's size, mtime and SHA-256 so a stale pack can be detected
+PACK_MAGIC = b"QCPACK03"
+PACK_HEADER = struct.Struct("<8sQQQq64s")
+PACK_FIELDS = ITEM_ALL_FIELDS
+PACK_SEPARATOR = "\x1f"
+
+# Length-prefixed binary data files start with this tag
+BINARY_MAGIC = b"QCB1"
+BINARY_LENGTH = struct.Struct("<I")
+BINARY_INT = struct.Struct("<q")
+
+# One or more blank (or whitespace-only) lines between raw data blocks
+BLOCK_SEPARATOR = re.compile(rb"(\r?\n(?:[ \t]*\r?\n)+)")
+# A blank line; DataReloader only cuts regions just after one
+BLANK_LINE = re.compile(rb"\n[ \t]*\r?\n")
+BLANK_LINE_END = re.compile(rb"\n[ \t]*\r?\n\Z")
+
+# ============================================================================
+# RECORD TYPES
+# ============================================================================
+
+class _Record(Mapping):
+    """
+    Base for compact data records. Fields live in __slots__ instead of a
+    per-record dict, but record["field"], record.get(...), `in` and copy()
+    still work like the plain dicts the loaders used to return.
+    """
+    __slots__ = ()
+    # Data fields, in file order; subclasses may add non-field slots
+    FIELDS = ()
+    # Fields that may be missing from a record dict, with their defaults
+    OPTIONAL_FIELDS = {}
+
+    @classmethod
+    def from_dict(cls, record_dict):
+        optional = cls.OPTIONAL_FIELDS
+        return cls(*[record_dict.get(field, optional[field]) if field in optional
+                     else record_dict[field] for field in cls.FIELDS])
+
+    def to_dict(self):
+        """Return a plain dict in the data file's representation."""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def copy(self):
+        return self.to_dict()
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __reduce__(self):
+        return self.__class__, tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+
+class Quest(_Record):
+    """Compact quest record built by the loaders."""
+    __slots__ = FIELDS = QUEST_FIELDS
+
+    def __init__(self, quest_id, title, description, reward_xp,
+                 reward_gold, required_level, prerequisite):
+        self.quest_id = quest_id
+        self.title = title
+        self.description = description
+        self.reward_xp = reward_xp
+        self.reward_gold = reward_gold
+        self.required_level = required_level
+        self.prerequisite = prerequisite
+
+
+class Item(_Record):
+    """
+    Compact item record built by the loaders.
+
+    effect is parsed once into a tuple of interned (stat, value) pairs, and
+    bonuses holds the same effect as a vector aligned with EFFECT_STATS, so
+    equipping or using the item never has to split the effect string again.
+    """
+    __slots__ = ITEM_ALL_FIELDS + ("bonuses",)
+    FIELDS = ITEM_ALL_FIELDS
+    OPTIONAL_FIELDS = ITEM_OPTIONAL_FIELDS
+
+    def __init__(self, item_id, name, type, effect, cost, description, stack_size=1, slot=""):
+        self.item_id = item_id
+        self.name = name
+        self.type = sys.intern(type)
+        self.effect = parse_effects(effect)
+        self.cost = cost
+        self.description = description
+        self.stack_size = stack_size
+        self.slot = sys.intern(slot)
+        self.bonuses = effect_vector(self.effect)
+
+    def to_dict(self):
+        item = super().to_dict()
+        item["effect"] = format_effects(self.effect)
+        return item
+
+
+def parse_effects(effect):
+    """
+    Return an item effect as a tuple of (stat, value) pairs.
+
+    Accepts the "stat:value[,stat:value...]" file form, a single
+    (stat, value) pair, or an already parsed tuple of pairs.
+    Raises: ValueError for a malformed effect
+    """
+    if isinstance(effect, str):
+        pairs = []
+        for part in effect.split(","):
+            stat, value = part.split(":")
+            pairs.append((sys.intern(stat), int(value)))
+        return tuple(pairs)
+    if len(effect) == 2 and isinstance(effect[0], str):
+        return ((sys.intern(effect[0]), effect[1]),)
+    return tuple(effect)
+
+
+def effect_vector(effect):
+    """
+    Return an effect as a tuple of bonuses, one per stat in EFFECT_STATS.
+    Raises: ValueError for a malformed effect or unknown stat
+    """
+    vector = [0] * len(EFFECT_STATS)
+    for stat, value in parse_effects(effect):
+        if stat not in EFFECT_STATS:
+            raise ValueError(f"Unknown effect stat: {stat}")
+        vector[EFFECT_STATS.index(stat)] += value
+    return tuple(vector)
+
+
+def format_effects(effect):
+    """Return an effect in its "stat:value[,stat:value...]" file form."""
+    return ",".join(f"{stat}:{value}" for stat, value in parse_effects(effect))
+
+
 # ============================================================================
 # DATA LOADING FUNCTIONS
 # ============================================================================
 
-def load_quests(filename="data/quests.txt"):
+def load_quests(filename="data/quests.txt", use_cache=True, errors=None):
     """
     Load quest data from file.
+
+    When use_cache is True a parsed copy is kept in data/.cache/ and reused
+    until the source file changes.
+
+    Pass a list as errors to load in partial mode: bad blocks are skipped
+    and described in errors as {"file", "line", "field", "reason"} dicts,
+    and the valid quests are still returned.
     """
     if not os.path.exists(filename):
         raise MissingDataFileError(f"Quest file not found: {filename}")
 
-    try:
-        with open(filename, "r", encoding="utf-8") as f:
-            content = f.read().strip()
+    if use_cache:
+        cached = read_data_cache(filename)
+        if cached is not None:
+            return cached
+        signature = _file_signature(filename)
 
-        if not content:
-            raise CorruptedDataError("Quest file is empty.")
-
-        blocks = content.split("\n\n")
+    try:
+        error_count = len(errors) if errors is not None else 0
         quests = {}
-
-        for block in blocks:
-            lines = [line.strip() for line in block.split("\n") if line.strip()]
-            quest_data = parse_quest_block(lines)
-            validate_quest_data(quest_data)
-
+        for quest_data in iter_quests(filename, errors):
             quest_id = quest_data["quest_id"]
             quests[quest_id] = quest_data
 
+        skipped = errors is not None and len(errors) > error_count
+        if not quests and not skipped:
+            raise CorruptedDataError("Quest file is empty.")
+
+        # Only a clean parse may be replayed from the cache
+        if use_cache and not skipped:
+            write_data_cache(filename, quests, signature)
         return quests
 
     except MissingDataFileError:
@@ -55,31 +253,40 @@ def load_quests(filename="data/quests.txt"):
         raise CorruptedDataError(f"Unexpected error while reading quests: {e}")
 
 
-def load_items(filename="data/items.txt"):
+def load_items(filename="data/items.txt", use_cache=True, errors=None):
     """
     Load item data from file.
+
+    When use_cache is True a parsed copy is kept in data/.cache/ and reused
+    until the source file changes.
+
+    Pass a list as errors to load in partial mode: bad blocks are skipped
+    and described in errors as {"file", "line", "field", "reason"} dicts,
+    and the valid items are still returned.
     """
     if not os.path.exists(filename):
         raise MissingDataFileError(f"Item file not found: {filename}")
 
-    try:
-        with open(filename, "r", encoding="utf-8") as f:
-            content = f.read().strip()
-
-        if not content:
-            raise CorruptedDataError("Item file is empty.")
+    if use_cache:
+        cached = read_data_cache(filename)
+        if cached is not None:
+            return cached
+        signature = _file_signature(filename)
 
-        blocks = content.split("\n\n")
+    try:
+        error_count = len(errors) if errors is not None else 0
         items = {}
-
-        for block in blocks:
-            lines = [line.strip() for line in block.split("\n") if line.strip()]
-            item_data = parse_item_block(lines)
-            validate_item_data(item_data)
-
+        for item_data in iter_items(filename, errors):
             item_id = item_data["item_id"]
             items[item_id] = item_data
 
+        skipped = errors is not None and len(errors) > error_count
+        if not items and not skipped:
+            raise CorruptedDataError("Item file is empty.")
+
+        # Only a clean parse may be replayed from the cache
+        if use_cache and not skipped:
+            write_data_cache(filename, items, signature)
         return items
 
     except MissingDataFileError:
@@ -90,22 +297,702 @@ def load_items(filename="data/items.txt"):
         raise CorruptedDataError(f"Unexpected error while reading items: {e}")
 
 
+# ============================================================================
+# STREAMING LOADERS
+# ============================================================================
+
+def iter_quests(filename="data/quests.txt", errors=None):
+    """
+    Yield validated quests one block at a time.
+
+    Reads the file line by line so only the current block is held in memory.
+    If errors is a list, bad blocks are recorded there and skipped.
+    Raises: MissingDataFileError, InvalidDataFormatError
+    """
+    for _, quest_data in _iter_records(filename, "quest", errors):
+        yield quest_data
+
+
+def iter_items(filename="data/items.txt", errors=None):
+    """
+    Yield validated items one block at a time.
+
+    Reads the file line by line so only the current block is held in memory.
+    If errors is a list, bad blocks are recorded there and skipped.
+    Raises: MissingDataFileError, InvalidDataFormatError
+    """
+    for _, item_data in _iter_records(filename, "item", errors):
+        yield item_data
+
+
+def _iter_records(filename, kind, errors=None):
+    """
+    Yield (line_number, record) for every block in a KEY: value file.
+
+    A bad block raises InvalidDataFormatError naming the file and line, or
+    is appended to errors and skipped when an errors list is given.
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"{kind.capitalize()} file not found: {filename}")
+
+    data_format = get_data_format(filename)
+    _, validate, record_type = _record_functions(kind)
+    for line_number, block in data_format["read"](filename):
+        try:
+            record = data_format["decode"](block, kind)
+            validate(record)
+            record = record_type.from_dict(record)
+        except (InvalidDataFormatError, TypeError, ValueError) as e:
+            problem = data_format["describe"](filename, kind, line_number, block, e)
+            if errors is None:
+                raise InvalidDataFormatError(
+                    f"{filename} line {problem['line']}: {problem['reason']}"
+                )
+            errors.append(problem)
+            continue
+        yield line_number, record
+
+
+def describe_block_error(filename, kind, first_line, lines, error):
+    """
+    Pin a parse/validation error on a block to a line and field.
+    Returns a {"file", "line", "field", "reason"} dict.
+    """
+    numeric_fields = QUEST_NUMERIC_FIELDS if kind == "quest" else ITEM_NUMERIC_FIELDS
+    key_lines = {}
+    for offset, line in enumerate(lines):
+        line_number = first_line + offset
+        if ": " not in line:
+            return _block_error(filename, line_number, None, f"Invalid {kind} line: {line}")
+        key, value = line.split(": ", 1)
+        key = key.lower()
+        key_lines.setdefault(key, line_number)
+        if key in numeric_fields and not _is_int(value):
+            return _block_error(filename, line_number, key, f"Field {key} must be an integer.")
+
+    # The block parsed, so ask the batch validator which field is wrong
+    parse_block = _record_functions(kind)[0]
+    return _describe_record(filename, kind, first_line, parse_block(lines), error, key_lines)
+
+
+def _describe_record(filename, kind, line_number, record, error, key_lines=None):
+    """Locate the first invalid field of a decoded record."""
+    if kind == "quest":
+        column_errors = validate_quest_columns(quest_columns([record]))
+    else:
+        column_errors = validate_item_columns(item_columns([record]))
+    if column_errors:
+        field = column_errors[0]["field"]
+        line_number = (key_lines or {}).get(field, line_number)
+        return _block_error(filename, line_number, field, column_errors[0]["reason"])
+    return _block_error(filename, line_number, None, str(error))
+
+
+def _block_error(filename, line_number, field, reason):
+    return {"file": filename, "line": line_number, "field": field, "reason": reason}
+
+
+def _is_int(value):
+    try:
+        int(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _iter_blocks(f):
+    """
+    Yield (first_line_number, stripped_lines) for each blank-line separated
+    block in an open text file.
+    """
+    block = []
+    start = 0
+    for line_number, raw_line in enumerate(f, 1):
+        line = raw_line.strip()
+        if line:
+            if not block:
+                start = line_number
+            block.append(line)
+        elif block:
+            yield start, block
+            block = []
+
+    if block:
+        yield start, block
+
+
+# ============================================================================
+# SHARDED LOADERS
+# ============================================================================
+
+def load_quest_shards(path="data/quests", workers=None):
+    """
+    Load quests split across many files, parsing shards in parallel.
+
+    path may be a directory (every *.txt inside it), a glob pattern or a
+    single file. workers defaults to the number of CPUs.
+    Raises: MissingDataFileError, InvalidDataFormatError (including
+    duplicate quest IDs), CorruptedDataError
+    """
+    return _load_shards(path, "quest", workers)
+
+
+def load_item_shards(path="data/items", workers=None):
+    """
+    Load items split across many files, parsing shards in parallel.
+
+    path may be a directory (every *.txt inside it), a glob pattern or a
+    single file. workers defaults to the number of CPUs.
+    Raises: MissingDataFileError, InvalidDataFormatError (including
+    duplicate item IDs), CorruptedDataError
+    """
+    return _load_shards(path, "item", workers)
+
+
+def find_shard_files(path):
+    """
+    Return the sorted list of data files matched by a directory or glob.
+    A directory matches every file with a registered data format extension.
+    """
+    if os.path.isdir(path):
+        files = []
+        for extension in DATA_FORMATS:
+            files.extend(glob.glob(os.path.join(path, "*" + extension)))
+    else:
+        files = glob.glob(path)
+    return sorted(f for f in files if os.path.isfile(f))
+
+
+def _load_shards(path, kind, workers):
+    label = kind.capitalize()
+    id_field = f"{kind}_id"
+
+    files = find_shard_files(path)
+    if not files:
+        raise MissingDataFileError(f"No {kind} files found: {path}")
+
+    try:
+        if workers == 1 or len(files) == 1:
+            results = [_load_shard(filename, kind) for filename in files]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_load_shard, files, [kind] * len(files)))
+
+        records = {}
+        origins = {}
+        for filename, shard in zip(files, results):
+            for line_number, record in shard:
+                record_id = record[id_field]
+                if record_id in origins:
+                    first_file, first_line = origins[record_id]
+                    raise InvalidDataFormatError(
+                        f"Duplicate {kind} ID '{record_id}' in {filename} line {line_number} "
+                        f"(first defined in {first_file} line {first_line})"
+                    )
+                origins[record_id] = (filename, line_number)
+                records[record_id] = record
+
+        if not records:
+            raise CorruptedDataError(f"{label} files are empty.")
+
+        return records
+
+    except MissingDataFileError:
+        raise
+    except InvalidDataFormatError:
+        raise
+    except Exception as e:
+        raise CorruptedDataError(f"Unexpected error while reading {kind}s: {e}")
+
+
+def _load_shard(filename, kind):
+    """Parse one shard in a worker process; returns [(line_number, record)]."""
+    return list(_iter_records(filename, kind))
+
+
+def _record_functions(kind):
+    """Return (parse_block, validate, record_type) for "quest" or "item"."""
+    if kind == "quest":
+        return parse_quest_block, validate_quest_data, Quest
+    if kind == "item":
+        return parse_item_block, validate_item_data, Item
+    raise ValueError(f"Unknown data kind: {kind}")
+
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+class DataReloader:
+    """
+    Keep a loaded quest or item dict in sync with its data file.
+
+    The file is cut into regions of about REGION_SIZE bytes at blank lines
+    and each region is fingerprinted. A reload skips the unchanged regions
+    at the start and end of the file, re-splits only the bytes between them
+    and parses only blocks that are new or edited there, then applies the
+    difference to `records` in place. Subscribers are called as
+    callback(added, changed, removed) with sets of IDs after every reload
+    that changed something.
+    """
+
+    REGION_SIZE = 1 << 16
+
+    def __init__(self, filename, kind, records=None):
+        self.filename = filename
+        self.kind = kind
+        self.last_error = None
+        self._id_field = f"{kind}_id"
+        self._subscribers = []
+        self._digests = {}
+        self._regions = []
+        self._signature = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        _record_functions(kind)
+
+        if records is None:
+            self.records = {}
+            self.reload()
+        else:
+            # Trust the caller's dict and only fingerprint the file
+            self.records = records
+            self._fingerprint_file()
+
+    def subscribe(self, callback):
+        """Register callback(added, changed, removed); returns callback."""
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def reload(self):
+        """
+        Apply any edits in the data file to `records`.
+
+        Returns (added, changed, removed) sets of IDs. If an edited block is
+        invalid nothing is applied and InvalidDataFormatError is raised.
+        """
+        with self._lock:
+            signature = self._stat_signature()
+            if signature == self._signature:
+                return set(), set(), set()
+
+            data = self._read_file()
+            start, end, first, last, line_number = self._match_regions(data)
+            old_digests = {}
+            for region in self._regions[first:last]:
+                old_digests.update(region[3])
+            known = {digest: record_id for record_id, digest in old_digests.items()}
+
+            parse_block, validate, record_type = _record_functions(self.kind)
+            digests = {}
+            updates = {}
+            regions = []
+            for region in self._split_regions(data[start:end]):
+                region_digests = {}
+                for block_line, block in _split_blocks(region, line_number):
+                    digest = hash(block)
+                    record_id = known.get(digest)
+                    if record_id is None:
+                        lines = [line.strip() for line in block.decode("utf-8").split("\n")]
+                        try:
+                            record = parse_block(lines)
+                            validate(record)
+                            record = record_type.from_dict(record)
+                        except InvalidDataFormatError as e:
+                            raise InvalidDataFormatError(f"{self.filename} line {block_line}: {e}")
+                        record_id = record[self._id_field]
+                        updates[record_id] = record
+                    region_digests[record_id] = digest
+                regions.append(_region_entry(region, region_digests))
+                digests.update(region_digests)
+                line_number += regions[-1][2]
+
+            added = {record_id for record_id in updates if record_id not in self._digests}
+            changed = set(updates) - added
+            removed = set(old_digests) - set(digests)
+
+            self.records.update(updates)
+            for record_id in removed:
+                self.records.pop(record_id, None)
+                self._digests.pop(record_id, None)
+            self._digests.update(digests)
+            self._regions[first:last] = regions
+            self._signature = signature
+
+        if added or changed or removed:
+            for callback in list(self._subscribers):
+                callback(added, changed, removed)
+        return added, changed, removed
+
+    def start(self, interval=1.0):
+        """Poll the data file for changes on a background thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background watcher started by start()."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _watch(self, interval):
+        while not self._stop_event.wait(interval):
+            try:
+                self.reload()
+                self.last_error = None
+            except (DataError, OSError) as e:
+                # Keep serving the last good data until the file is fixed
+                self.last_error = e
+
+    def _stat_signature(self):
+        if not os.path.exists(self.filename):
+            raise MissingDataFileError(f"{self.kind.capitalize()} file not found: {self.filename}")
+        stat = os.stat(self.filename)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _read_file(self):
+        with open(self.filename, "rb") as f:
+            return f.read()
+
+    def _split_regions(self, data):
+        """Yield consecutive regions of data, each cut just after a blank line."""
+        start = 0
+        while start < len(data):
+            match = BLANK_LINE.search(data, start + self.REGION_SIZE)
+            stop = match.end() if match else len(data)
+            yield data[start:stop]
+            start = stop
+
+    def _match_regions(self, data):
+        """
+        Match the stored regions against the start and end of data.
+
+        Returns (start, end, first, last, line_number): data[start:end]
+        replaces self._regions[first:last] and begins on line_number.
+        """
+        view = memoryview(data)
+        regions = self._regions
+        start, first, line_number = 0, 0, 1
+        while first < len(regions):
+            length, digest, lines, _ = regions[first]
+            stop = start + length
+            if stop > len(data) or hash(view[start:stop]) != digest:
+                break
+            # Text appended after the old last line would join its last block
+            if stop != len(data) and not _ends_block(data, stop):
+                break
+            start, first, line_number = stop, first + 1, line_number + lines
+
+        end, last = len(data), len(regions)
+        while last > first:
+            length, digest, _, _ = regions[last - 1]
+            begin = end - length
+            if begin < start or hash(view[begin:end]) != digest:
+                break
+            if begin != start and not _ends_block(data, begin):
+                break
+            end, last = begin, last - 1
+        return start, end, first, last, line_number
+
+    def _fingerprint_file(self):
+        """Record block fingerprints without parsing, reading only ID lines."""
+        id_line = re.compile(rb"^[ \t]*" + self._id_field.encode("ascii") + rb": (.*?)\s*$",
+                             re.IGNORECASE | re.MULTILINE)
+        with self._lock:
+            signature = self._stat_signature()
+            digests = {}
+            regions = []
+            for region in self._split_regions(self._read_file()):
+                region_digests = {}
+                for _, block in _split_blocks(region):
+                    match = id_line.search(block)
+                    if match:
+                        region_digests[match.group(1).decode("utf-8")] = hash(block)
+                regions.append(_region_entry(region, region_digests))
+                digests.update(region_digests)
+            self._digests = digests
+            self._regions = regions
+            self._signature = signature
+
+
+def _region_entry(region, digests):
+    """Return the (length, hash, line_count, digests) kept for one region."""
+    return len(region), hash(region), region.count(b"\n"), digests
+
+
+def _ends_block(data, position):
+    """Return True if data[:position] ends with a blank line."""
+    return BLANK_LINE_END.search(data, max(0, position - 64), position) is not None
+
+
+def _split_blocks(buffer, line_number=1):
+    """
+    Yield (first_line_number, raw_block_bytes) for each block in buffer.
+    Blocks are split as bytes so unchanged blocks never get decoded.
+    """
+    if b"\r" in buffer or b"\n " in buffer or b"\n\t" in buffer:
+        pieces = BLOCK_SEPARATOR.split(buffer)
+        blocks = pieces[::2]
+        separators = [piece.count(b"\n") for piece in pieces[1::2]]
+    else:
+        # Common case: plain "\n\n" separators, split without regex
+        blocks = buffer.split(b"\n\n")
+        separators = [2] * (len(blocks) - 1)
+
+    for piece, separator in zip(blocks, separators + [0]):
+        block = piece.strip()
+        if block:
+            if block is piece:
+                yield line_number, block
+            else:
+                leading = piece[:len(piece) - len(piece.lstrip())]
+                yield line_number + leading.count(b"\n"), block
+        line_number += piece.count(b"\n") + separator
+
+
+# ============================================================================
+# PARSED DATA CACHE
+# ============================================================================
+
+def get_cache_path(filename):
+    """
+    Return the cache file used for a data file: data/.cache/<name>.bin for
+    .txt files and data/.cache/<name>.<ext>.bin for other formats.
+    """
+    directory, base = os.path.split(filename)
+    name, extension = os.path.splitext(base)
+    if extension.lower() != ".txt":
+        name = base
+    return os.path.join(directory, ".cache", name + ".bin")
+
+
+def read_data_cache(filename):
+    """
+    Return the cached records for filename, or None if there is no usable
+    cache. Stale or corrupted caches are treated the same as a missing one.
+    """
+    cache_path = get_cache_path(filename)
+    try:
+        stat = os.stat(filename)
+        with open(cache_path, "rb") as f:
+            header = pickle.load(f)
+            if header.get("version") != CACHE_VERSION:
+                return None
+            # Cheap checks first so an edited file never gets hashed twice
+            if header.get("size") != stat.st_size or header.get("mtime_ns") != stat.st_mtime_ns:
+                return None
+            if header.get("sha256") != _file_signature(filename)[2]:
+                return None
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def write_data_cache(filename, records, signature=None):
+    """
+    Store parsed records next to filename. The cache is only an optimization,
+    so failures to write it are ignored.
+    """
+    if signature is None:
+        signature = _file_signature(filename)
+
+    # Don't cache records if the file changed while it was being parsed
+    stat = os.stat(filename)
+    if (stat.st_size, stat.st_mtime_ns) != signature[:2]:
+        return False
+
+    header = {
+        "version": CACHE_VERSION,
+        "size": signature[0],
+        "mtime_ns": signature[1],
+        "sha256": signature[2],
+    }
+    cache_path = get_cache_path(filename)
+    temp_path = cache_path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+        return True
+    except (OSError, pickle.PicklingError):
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+
+
+def _file_signature(filename):
+    """Return (size, mtime_ns, sha256 hex digest) for a file."""
+    stat = os.stat(filename)
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+
+# ============================================================================
+# MEMORY-MAPPED ITEM CATALOG
+# ============================================================================
+
+class ItemCatalog(Mapping):
+    """
+    Read-only item_id -> item mapping backed by a memory-mapped pack file.
+
+    Only an offset index is kept in memory; an item is decoded from the
+    mapped file each time it is looked up. Usable anywhere an item data
+    dict is expected, e.g. inventory_system.display_inventory.
+    """
+
+    def __init__(self, pack_path):
+        self.pack_path = pack_path
+        self._file = open(pack_path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        magic, count, index_offset = PACK_HEADER.unpack_from(self._map, 0)[:3]
+        if magic != PACK_MAGIC:
+            self.close()
+            raise CorruptedDataError(f"Not an item pack file: {pack_path}")
+
+        # count + 1 offsets; the last one marks the end of the final record
+        offsets_end = index_offset + (count + 1) * 8
+        self._offsets = memoryview(self._map)[index_offset:offsets_end].cast("Q")
+        item_ids = self._map[offsets_end:].decode("utf-8").split("\n") if count else []
+        self._index = {item_id: position for position, item_id in enumerate(item_ids)}
+
+    def __getitem__(self, item_id):
+        position = self._index[item_id]
+        start = self._offsets[position]
+        end = self._offsets[position + 1]
+        fields = self._map[start:end].decode("utf-8").split(PACK_SEPARATOR)
+        item_id, name, item_type, effect, cost, description, stack_size, slot = fields
+        return Item(item_id, name, item_type, effect, int(cost), description,
+                    int(stack_size), slot)
+
+    def __contains__(self, item_id):
+        return item_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """Release the memory map and the underlying file."""
+        if self._map is None:
+            return
+        if hasattr(self, "_offsets"):
+            self._offsets.release()
+        self._map.close()
+        self._file.close()
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_item_catalog(filename="data/items.txt"):
+    """
+    Open a memory-mapped ItemCatalog for an items file, (re)building its
+    pack in data/.cache/ first if it is missing or out of date.
+    Raises: MissingDataFileError, InvalidDataFormatError
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"Item file not found: {filename}")
+
+    pack_path = os.path.splitext(get_cache_path(filename))[0] + ".pack"
+    if not _pack_is_current(pack_path, filename):
+        build_item_pack(filename, pack_path)
+    return ItemCatalog(pack_path)
+
+
+def build_item_pack(filename, pack_path):
+    """
+    Stream an items file into the packed on-disk form used by ItemCatalog.
+    Only the offset index is held in memory while writing.
+    """
+    signature = _file_signature(filename)
+    offsets = array("Q")
+    item_ids = []
+
+    os.makedirs(os.path.dirname(pack_path) or ".", exist_ok=True)
+    temp_path = pack_path + ".tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(b"\0" * PACK_HEADER.size)
+            position = PACK_HEADER.size
+            for item in iter_items(filename):
+                values = item.to_dict()
+                record = PACK_SEPARATOR.join(str(values[field]) for field in PACK_FIELDS)
+                data = record.encode("utf-8")
+                offsets.append(position)
+                item_ids.append(item["item_id"])
+                f.write(data)
+                position += len(data)
+            offsets.append(position)
+
+            index_offset = position
+            f.write(offsets.tobytes())
+            f.write("\n".join(item_ids).encode("utf-8"))
+
+            f.seek(0)
+            f.write(PACK_HEADER.pack(
+                PACK_MAGIC, len(item_ids), index_offset,
+                signature[0], signature[1], signature[2].encode("ascii")
+            ))
+        os.replace(temp_path, pack_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return pack_path
+
+
+def _pack_is_current(pack_path, filename):
+    """Return True if pack_path was built from the current filename."""
+    try:
+        with open(pack_path, "rb") as f:
+            header = PACK_HEADER.unpack(f.read(PACK_HEADER.size))
+    except (OSError, struct.error):
+        return False
+
+    magic, _, _, size, mtime_ns, digest = header
+    if magic != PACK_MAGIC:
+        return False
+    stat = os.stat(filename)
+    if (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+        return False
+    return _file_signature(filename)[2] == digest.decode("ascii")
+
+
 # ============================================================================
 # VALIDATION FUNCTIONS
 # ============================================================================
 
 def validate_quest_data(quest_dict):
-    required = [
-        "quest_id", "title", "description",
-        "reward_xp", "reward_gold",
-        "required_level", "prerequisite"
-    ]
-    for field in required:
+    for field in QUEST_FIELDS:
         if field not in quest_dict:
             raise InvalidDataFormatError(f"Missing field in quest: {field}")
 
     # numeric fields
-    for num in ["reward_xp", "reward_gold", "required_level"]:
+    for num in QUEST_NUMERIC_FIELDS:
         if not isinstance(quest_dict[num], int):
             raise InvalidDataFormatError(f"Field {num} must be an integer.")
 
@@ -113,29 +1000,312 @@ def validate_quest_data(quest_dict):
 
 
 def validate_item_data(item_dict):
-    required = ["item_id", "name", "type", "effect", "cost", "description"]
-
-    for field in required:
+    for field in ITEM_FIELDS:
         if field not in item_dict:
             raise InvalidDataFormatError(f"Missing field in item: {field}")
 
-    if item_dict["type"] not in ["weapon", "armor", "consumable"]:
+    if item_dict["type"] not in ITEM_TYPES:
         raise InvalidDataFormatError(f"Invalid item type: {item_dict['type']}")
 
     if not isinstance(item_dict["cost"], int):
         raise InvalidDataFormatError("Item cost must be an integer.")
 
-    # effect must be "stat:value"
-    if ":" not in item_dict["effect"]:
+    stack_size = item_dict.get("stack_size", 1)
+    if stack_size.__class__ is not int or stack_size < 1:
+        raise InvalidDataFormatError("Item stack_size must be a positive integer.")
+
+    slot = item_dict.get("slot", "")
+    if slot and (not isinstance(slot, str) or not SLOT_FORMAT.fullmatch(slot)):
+        raise InvalidDataFormatError(f"Invalid item slot: {slot}")
+
+    # Item records carry an already parsed effect
+    if isinstance(item_dict["effect"], tuple):
+        return True
+
+    # effect must be "stat:value", or several separated by commas
+    if not isinstance(item_dict["effect"], str) or ":" not in item_dict["effect"]:
         raise InvalidDataFormatError("Item effect must be in format stat:value")
 
-    stat, value = item_dict["effect"].split(":")
-    if not value.isdigit():
-        raise InvalidDataFormatError("Item effect value must be numeric.")
+    for part in item_dict["effect"].split(","):
+        stat, _, value = part.partition(":")
+        if not value.isdigit():
+            raise InvalidDataFormatError("Item effect value must be numeric.")
+        if stat not in EFFECT_STATS:
+            raise InvalidDataFormatError(f"Invalid item effect stat: {stat}")
 
     return True
 
 
+# ============================================================================
+# BATCH VALIDATION
+# ============================================================================
+
+def quest_columns(quests):
+    """Return a quest catalog (dict or iterable of records) as column lists."""
+    return _to_columns(quests, QUEST_FIELDS)
+
+
+def item_columns(items):
+    """
+    Return an item catalog (dict or iterable of records) as column lists,
+    with defaults filled in for missing optional fields.
+    """
+    return _to_columns(items, ITEM_ALL_FIELDS, ITEM_OPTIONAL_FIELDS)
+
+
+def validate_quest_columns(columns):
+    """
+    Validate a whole quest catalog in columnar form ({field: [values]}).
+
+    Every problem is reported instead of stopping at the first one.
+    Returns a list of {"row", "id", "field", "reason"} dicts sorted by row
+    and field; an empty list means the catalog is valid.
+    """
+    errors = []
+    rows = _check_required_columns(columns, QUEST_FIELDS, "quest_id", errors)
+    ids = columns.get("quest_id") or [None] * rows
+
+    minimums = {"reward_xp": 0, "reward_gold": 0, "required_level": 1}
+    for field in QUEST_NUMERIC_FIELDS:
+        minimum = minimums[field]
+        for row in _bad_integers(columns.get(field), minimum):
+            errors.append(_column_error(row, ids, field,
+                                        f"Field {field} must be an integer >= {minimum}."))
+
+    return _sorted_errors(errors, QUEST_FIELDS)
+
+
+def validate_item_columns(columns):
+    """
+    Validate a whole item catalog in columnar form ({field: [values]}).
+
+    Checks required fields, item types, costs, effect formats, and the
+    optional stack sizes and slots for every row in one pass per column. Returns a list of
+    {"row", "id", "field", "reason"} dicts sorted by row and field; an empty
+    list means the catalog is valid.
+    """
+    errors = []
+    rows = _check_required_columns(columns, ITEM_FIELDS, "item_id", errors)
+    ids = columns.get("item_id") or [None] * rows
+
+    types = columns.get("type") or []
+    bad_types = set(types) - ITEM_TYPES - {None}
+    for row in _rows_with(types, bad_types):
+        errors.append(_column_error(row, ids, "type", f"Invalid item type: {types[row]}"))
+
+    for row in _bad_integers(columns.get("cost"), 0):
+        errors.append(_column_error(row, ids, "cost", "Item cost must be an integer >= 0."))
+
+    # Catalogs reuse a handful of effects, so check each distinct one once
+    effects = columns.get("effect") or []
+    bad_effects = {effect for effect in set(effects) - {None} if not _valid_effect(effect)}
+    for row in _rows_with(effects, bad_effects):
+        errors.append(_column_error(row, ids, "effect",
+                                    "Item effect must be in format stat:value"))
+
+    for row in _bad_integers(columns.get("stack_size"), 1):
+        errors.append(_column_error(row, ids, "stack_size",
+                                    "Item stack_size must be a positive integer."))
+
+    slots = columns.get("slot") or []
+    bad_slots = {slot for slot in set(slots) - {None, ""}
+                 if not (isinstance(slot, str) and SLOT_FORMAT.fullmatch(slot))}
+    for row in _rows_with(slots, bad_slots):
+        errors.append(_column_error(row, ids, "slot", f"Invalid item slot: {slots[row]}"))
+
+    return _sorted_errors(errors, ITEM_ALL_FIELDS)
+
+
+def _valid_effect(effect):
+    if effect.__class__ is not tuple and not (
+            isinstance(effect, str) and EFFECT_FORMAT.fullmatch(effect)):
+        return False
+    try:
+        effect_vector(effect)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _rows_with(column, values):
+    """Return the rows of column holding any of values."""
+    if not values:
+        return []
+    return [row for row, value in enumerate(column) if value in values]
+
+
+def _to_columns(records, fields, defaults=None):
+    defaults = defaults or {}
+    if isinstance(records, Mapping):
+        records = records.values()
+    records = list(records)
+    return {field: [record.get(field, defaults.get(field)) for record in records]
+            for field in fields}
+
+
+def _check_required_columns(columns, fields, id_field, errors):
+    """Report missing columns/values; returns the catalog's row count."""
+    rows = max((len(columns[field]) for field in fields if columns.get(field) is not None), default=0)
+    ids = columns.get(id_field) or [None] * rows
+
+    for field in fields:
+        column = columns.get(field)
+        if column is None:
+            column = []
+        if len(column) < rows:
+            for row in range(len(column), rows):
+                errors.append(_column_error(row, ids, field, f"Missing field: {field}"))
+        if None in column or "" in column:
+            for row in _rows_with(column, {None, ""}):
+                errors.append(_column_error(row, ids, field, f"Missing field: {field}"))
+    return rows
+
+
+def _bad_integers(column, minimum):
+    """Return the rows of column that are not ints (bools excluded) >= minimum."""
+    if not column:
+        return []
+    if set(map(type, column)) == {int} and min(column) >= minimum:
+        return []
+    return [row for row, value in enumerate(column)
+            if value is not None and (value.__class__ is not int or value < minimum)]
+
+
+def _sorted_errors(errors, fields):
+    order = {field: position for position, field in enumerate(fields)}
+    errors.sort(key=lambda error: (error["row"], order[error["field"]]))
+    return errors
+
+
+def _column_error(row, ids, field, reason):
+    record_id = ids[row] if row < len(ids) else None
+    return {"row": row, "id": record_id, "field": field, "reason": reason}
+
+
+# ============================================================================
+# COLUMNAR TABLES
+# ============================================================================
+
+def item_table(items):
+    """
+    Return a struct-of-arrays view of an item catalog for analytics.
+
+    Keys: item_id (list), cost and effect_value (int arrays), type_code and
+    stat_code (small int arrays indexing type_categories/stat_categories),
+    and a bonus_<stat> int array per EFFECT_STATS entry. effect_value and
+    stat_code describe the first stat of multi-stat effects; the bonus
+    arrays cover every stat. Arrays are NumPy arrays when NumPy is
+    installed, array.array otherwise.
+    """
+    records = list(items.values()) if isinstance(items, Mapping) else list(items)
+    effects = [_effect_pair(record["effect"]) for record in records]
+    types = [record["type"] for record in records]
+    vectors = [getattr(record, "bonuses", None) or effect_vector(record["effect"])
+               for record in records]
+
+    type_categories, type_codes = _categorize(types)
+    stat_categories, stat_codes = _categorize([stat for stat, _ in effects])
+    table = {
+        "item_id": [record["item_id"] for record in records],
+        "cost": _int_array([record["cost"] for record in records]),
+        "effect_value": _int_array([value for _, value in effects]),
+        "type_code": _int_array(type_codes, "b"),
+        "type_categories": type_categories,
+        "stat_code": _int_array(stat_codes, "b"),
+        "stat_categories": stat_categories,
+    }
+    for position, stat in enumerate(EFFECT_STATS):
+        table[f"bonus_{stat}"] = _int_array([vector[position] for vector in vectors])
+    return table
+
+
+def quest_table(quests):
+    """
+    Return a struct-of-arrays view of a quest catalog: quest_id (list) plus
+    reward_xp, reward_gold and required_level int arrays.
+    """
+    records = list(quests.values()) if isinstance(quests, Mapping) else list(quests)
+    table = {"quest_id": [record["quest_id"] for record in records]}
+    for field in QUEST_NUMERIC_FIELDS:
+        table[field] = _int_array([record[field] for record in records])
+    return table
+
+
+def select_items(table, item_type=None, stat=None, max_cost=None,
+                 order_by="bonus", descending=True, limit=None):
+    """
+    Filter and sort an item_table without looping over item dicts.
+
+    e.g. select_items(table, "weapon", stat="strength", max_cost=199)
+    returns the IDs of weapons under 200 gold, strongest bonus first.
+    stat matches any item whose effect changes it; order_by="bonus" sorts
+    by that stat's bonus (by effect_value when no stat is given).
+    """
+    type_code = _category_code(table["type_categories"], item_type)
+    if type_code is None and item_type is not None:
+        return []
+    if stat is not None and f"bonus_{stat}" not in table:
+        return []
+    bonus = table[f"bonus_{stat}"] if stat is not None else None
+    if order_by == "bonus":
+        order_by = "effect_value" if stat is None else f"bonus_{stat}"
+
+    if np is not None:
+        mask = np.ones(len(table["item_id"]), dtype=bool)
+        if type_code is not None:
+            mask &= table["type_code"] == type_code
+        if bonus is not None:
+            mask &= bonus != 0
+        if max_cost is not None:
+            mask &= table["cost"] <= max_cost
+        rows = np.flatnonzero(mask)
+        if order_by is not None:
+            keys = table[order_by][rows]
+            rows = rows[np.argsort(-keys if descending else keys, kind="stable")]
+        rows = rows.tolist()
+    else:
+        rows = range(len(table["item_id"]))
+        if type_code is not None:
+            rows = [row for row in rows if table["type_code"][row] == type_code]
+        if bonus is not None:
+            rows = [row for row in rows if bonus[row]]
+        if max_cost is not None:
+            cost = table["cost"]
+            rows = [row for row in rows if cost[row] <= max_cost]
+        rows = list(rows)
+        if order_by is not None:
+            keys = table[order_by]
+            rows.sort(key=lambda row: -keys[row] if descending else keys[row])
+
+    if limit is not None:
+        rows = rows[:limit]
+    item_ids = table["item_id"]
+    return [item_ids[row] for row in rows]
+
+
+def _effect_pair(effect):
+    return parse_effects(effect)[0]
+
+
+def _categorize(values):
+    """Return (sorted categories, code per value)."""
+    categories = tuple(sorted(set(values)))
+    codes = {category: code for code, category in enumerate(categories)}
+    return categories, [codes[value] for value in values]
+
+
+def _category_code(categories, value):
+    if value is None or value not in categories:
+        return None
+    return categories.index(value)
+
+
+def _int_array(values, typecode="q"):
+    if np is not None:
+        return np.array(values, dtype=np.int8 if typecode == "b" else np.int64)
+    return array(typecode, values)
+
+
 # ============================================================================
 # DEFAULT DATA CREATION
 # ============================================================================
@@ -234,19 +1404,269 @@ def parse_item_block(lines):
                 item["cost"] = int(value)
             elif key == "description":
                 item["description"] = value
+            elif key == "stack_size":
+                item["stack_size"] = int(value)
+            elif key == "slot":
+                item["slot"] = value
 
         return item
 
     except ValueError:
-        raise InvalidDataFormatError("Cost field must be an integer.")
+        raise InvalidDataFormatError("Cost and stack_size fields must be integers.")
     except Exception as e:
         raise InvalidDataFormatError(f"Error parsing item block: {e}")
 
+# ============================================================================
+# DATA FORMATS
+# ============================================================================
+
+def register_data_format(extension, read, decode, write, describe=None):
+    """
+    Register a data file format for an extension such as ".jsonl".
+
+    read(filename) yields (line_number, raw_block); decode(raw_block, kind)
+    turns one block into a field dict, which is then validated like any
+    other record; write(filename, records, kind) saves validated records.
+    describe builds the error dict for a bad block (optional).
+    """
+    DATA_FORMATS[extension.lower()] = {
+        "read": read,
+        "decode": decode,
+        "write": write,
+        "describe": describe or _describe_raw_block,
+    }
+
+
+def get_data_format(filename):
+    """Return the registered format for filename's extension."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in DATA_FORMATS:
+        raise InvalidDataFormatError(f"Unsupported data file format: {filename}")
+    return DATA_FORMATS[extension]
+
+
+def write_quests(quests, filename):
+    """Write quest records in the format picked by filename's extension."""
+    return _write_records(quests, filename, "quest")
+
+
+def write_items(items, filename):
+    """Write item records in the format picked by filename's extension."""
+    return _write_records(items, filename, "item")
+
+
+def convert_data_file(source, destination, kind):
+    """
+    Convert a quest ("quest") or item ("item") data file to the format of
+    destination, e.g. data/items.txt -> data/items.jsonl.
+    Returns the number of records written.
+    """
+    records = list(_iter_records(source, kind))
+    _write_records([record for _, record in records], destination, kind)
+    return len(records)
+
+
+def _write_records(records, filename, kind):
+    if isinstance(records, Mapping):
+        records = records.values()
+    fields = QUEST_FIELDS if kind == "quest" else ITEM_ALL_FIELDS
+    rows = [_plain_record(record, fields) for record in records]
+
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = filename + ".tmp"
+    try:
+        get_data_format(filename)["write"](temp_path, rows, kind)
+        os.replace(temp_path, filename)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return len(rows)
+
+
+def _plain_record(record, fields):
+    """
+    Return {field: value} in file representation (effect as stat:value,...),
+    with defaults filled in for missing optional fields.
+    """
+    if hasattr(record, "to_dict"):
+        return record.to_dict()
+    plain = {field: record[field] if field in record else ITEM_OPTIONAL_FIELDS[field]
+             for field in fields}
+    if isinstance(plain.get("effect"), tuple):
+        plain["effect"] = format_effects(plain["effect"])
+    return plain
+
+
+def _describe_raw_block(filename, kind, line_number, block, error):
+    try:
+        record = DATA_FORMATS[os.path.splitext(filename)[1].lower()]["decode"](block, kind)
+    except (InvalidDataFormatError, ValueError):
+        return _block_error(filename, line_number, None, str(error))
+    return _describe_record(filename, kind, line_number, record, error)
+
+
+# --- KEY: value text (.txt) ---
+
+def _read_text(filename):
+    with open(filename, "r", encoding="utf-8") as f:
+        yield from _iter_blocks(f)
+
+
+def _decode_text(lines, kind):
+    return _record_functions(kind)[0](lines)
+
+
+def _write_text(filename, records, kind):
+    fields = QUEST_FIELDS if kind == "quest" else ITEM_FIELDS
+    optional = {} if kind == "quest" else ITEM_OPTIONAL_FIELDS
+    with open(filename, "w", encoding="utf-8") as f:
+        for index, record in enumerate(records):
+            if index:
+                f.write("\n")
+            for field in fields:
+                f.write(f"{field.upper()}: {record[field]}\n")
+            # Optional fields are only written when they differ from the default
+            for field, default in optional.items():
+                if record.get(field, default) != default:
+                    f.write(f"{field.upper()}: {record[field]}\n")
+
+
+# --- JSON Lines (.jsonl) ---
+
+def _read_json_lines(filename):
+    with open(filename, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                yield line_number, line
+
+
+def _decode_json_line(line, kind):
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise InvalidDataFormatError(f"Expected a JSON object per line, got: {line.strip()}")
+    # The validators expect the text format's value types
+    for key, value in record.items():
+        if value.__class__ not in (str, int):
+            raise InvalidDataFormatError(f"Field {key} must be a string or integer.")
+    return record
+
+
+def _write_json_lines(filename, records, kind):
+    with open(filename, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+
+
+# --- Length-prefixed binary (.qcb) ---
+# File: BINARY_MAGIC, a schema (u8 field count, then per field u8 name
+# length, name, u8 tag "i" or "s"), then per record a u32 byte length and
+# the record: one int64 per "i" field and one u32 byte length per "s" field
+# packed up front, followed by the UTF-8 bytes of the string fields.
+
+def _read_binary(filename):
+    with open(filename, "rb") as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise InvalidDataFormatError(f"Not a binary data file: {filename}")
+        schema = _read_binary_schema(f, filename)
+        record_number = 0
+        while True:
+            prefix = f.read(BINARY_LENGTH.size)
+            if not prefix:
+                return
+            record_number += 1
+            if len(prefix) < BINARY_LENGTH.size:
+                raise InvalidDataFormatError(f"{filename}: truncated record {record_number}")
+            size = BINARY_LENGTH.unpack(prefix)[0]
+            payload = f.read(size)
+            if len(payload) < size:
+                raise InvalidDataFormatError(f"{filename}: truncated record {record_number}")
+            yield record_number, (schema, payload)
+
+
+def _read_binary_schema(f, filename):
+    """Return (field names, string field positions, fixed-part Struct)."""
+    try:
+        names = []
+        tags = []
+        for _ in range(f.read(1)[0]):
+            name_length = f.read(1)[0]
+            names.append(f.read(name_length).decode("utf-8"))
+            tags.append(f.read(1))
+    except IndexError:
+        raise InvalidDataFormatError(f"{filename}: truncated binary schema")
+    if any(tag not in (b"i", b"s") for tag in tags):
+        raise InvalidDataFormatError(f"{filename}: unknown binary value tag")
+
+    layout = "<" + "".join("q" if tag == b"i" else "I" for tag in tags)
+    strings = [position for position, tag in enumerate(tags) if tag == b"s"]
+    return names, strings, struct.Struct(layout)
+
+
+def _decode_binary(block, kind):
+    (names, strings, fixed), payload = block
+    try:
+        values = list(fixed.unpack_from(payload, 0))
+    except struct.error as e:
+        raise InvalidDataFormatError(f"Malformed binary record: {e}")
+
+    position = fixed.size
+    for index in strings:
+        end = position + values[index]
+        if end > len(payload):
+            raise InvalidDataFormatError("Malformed binary record: string runs past record end")
+        values[index] = payload[position:end].decode("utf-8")
+        position = end
+    return dict(zip(names, values))
+
+
+def _write_binary(filename, records, kind):
+    fields = QUEST_FIELDS if kind == "quest" else ITEM_ALL_FIELDS
+    numeric_fields = QUEST_NUMERIC_FIELDS if kind == "quest" else ITEM_NUMERIC_FIELDS
+    tags = [b"i" if field in numeric_fields else b"s" for field in fields]
+    fixed = struct.Struct("<" + "".join("q" if tag == b"i" else "I" for tag in tags))
+
+    with open(filename, "wb") as f:
+        f.write(BINARY_MAGIC)
+        f.write(bytes([len(fields)]))
+        for field, tag in zip(fields, tags):
+            name = field.encode("utf-8")
+            f.write(bytes([len(name)]) + name + tag)
+
+        for record in records:
+            numbers = []
+            strings = []
+            for field, tag in zip(fields, tags):
+                if tag == b"i":
+                    numbers.append(int(record[field]))
+                else:
+                    data = str(record[field]).encode("utf-8")
+                    strings.append(data)
+                    numbers.append(len(data))
+            payload = fixed.pack(*numbers) + b"".join(strings)
+            f.write(BINARY_LENGTH.pack(len(payload)))
+            f.write(payload)
+
+
+DATA_FORMATS = {}
+register_data_format(".txt", _read_text, _decode_text, _write_text, describe_block_error)
+register_data_format(".jsonl", _read_json_lines, _decode_json_line, _write_json_lines)
+register_data_format(".qcb", _read_binary, _decode_binary, _write_binary)
+
+
 # ============================================================================
 # TESTING
 # ============================================================================
 
 if __name__ == "__main__":
+    # Converter entry point: python game_data.py convert item data/items.txt data/items.jsonl
+    if len(sys.argv) == 5 and sys.argv[1] == "convert":
+        count = convert_data_file(sys.argv[3], sys.argv[4], sys.argv[2])
+        print(f"Converted {count} {sys.argv[2]} records to {sys.argv[4]}")
+        sys.exit(0)
+
     print("=== GAME DATA MODULE TEST ===")
     
     # Test creating default files
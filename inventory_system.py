@@ -9,6 +9,9 @@ AI Usage: [Document any AI assistance used]
 This module handles inventory management, item usage, and equipment.
 """
 
+from contextlib import contextmanager
+from operator import add
+from game_data import EFFECT_STATS, SLOT_FORMAT, effect_vector, parse_effects
 from custom_exceptions import (
     InventoryFullError,
     ItemNotFoundError,
@@ -16,50 +19,242 @@ from custom_exceptions import (
     InvalidItemTypeError
 )
 
-# Maximum inventory size
+# Default inventory capacity in slots; a character's "inventory_capacity"
+# overrides it
 MAX_INVENTORY_SIZE = 20
 
+# item_id -> copies per slot, for items whose data isn't passed in
+# (see set_item_stack_sizes); anything not listed takes one slot per copy
+ITEM_STACK_SIZES = {}
+
+# item_id -> bonus vector of equippable items (see set_item_data), for
+# equipment whose bonus wasn't stored with the character (older saves)
+ITEM_BONUSES = {}
+
+# Stats an item effect may change; bonus vectors hold one value per stat
+STAT_NAMES = EFFECT_STATS
+# Stats with a base value that equipment adds to
+DERIVED_STATS = ("max_health", "strength", "magic")
+NO_BONUSES = (0,) * len(STAT_NAMES)
+
+# Slots also mirrored in character["equipped_<slot>"] for older code
+MIRRORED_SLOTS = ("weapon", "armor")
+
+# ============================================================================
+# INVENTORY CONTAINER
+# ============================================================================
+
+class Inventory:
+    """
+    A character's items as an item_id -> count map, so membership, count,
+    append and remove are O(1). It behaves like the list of item IDs it
+    replaces (iteration, len, indexing, ==), with copies of the same item
+    kept together in the order the item was first added.
+
+    len() counts items; `slots` counts occupied slots, where up to an
+    item's stack size copies share one slot. Both are kept up to date on
+    every change.
+    """
+
+    __slots__ = ("_counts", "_size", "_stacks", "_slots")
+
+    def __init__(self, items=()):
+        self._counts = {}
+        self._size = 0
+        # item_id -> stack size, only for items that stack
+        self._stacks = {}
+        self._slots = 0
+        self.extend(items)
+
+    @property
+    def slots(self):
+        return self._slots
+
+    def append(self, item_id, stack_size=None):
+        if stack_size is not None:
+            self.set_stack_size(item_id, stack_size)
+        elif item_id not in self._counts and item_id in ITEM_STACK_SIZES:
+            self.set_stack_size(item_id, ITEM_STACK_SIZES[item_id])
+        count = self._counts.get(item_id, 0)
+        if count % self._stacks.get(item_id, 1) == 0:
+            self._slots += 1
+        self._counts[item_id] = count + 1
+        self._size += 1
+
+    def extend(self, items):
+        for item_id in items:
+            self.append(item_id)
+
+    def remove(self, item_id):
+        count = self._counts.get(item_id)
+        if not count:
+            raise ValueError(f"{item_id!r} not in inventory")
+        if (count - 1) % self._stacks.get(item_id, 1) == 0:
+            self._slots -= 1
+        if count == 1:
+            del self._counts[item_id]
+        else:
+            self._counts[item_id] = count - 1
+        self._size -= 1
+
+    def count(self, item_id):
+        return self._counts.get(item_id, 0)
+
+    def set_stack_size(self, item_id, stack_size):
+        """Change how many copies of an item share a slot."""
+        stack_size = max(int(stack_size), 1)
+        current = self._stacks.get(item_id, 1)
+        if stack_size == current:
+            return
+        count = self._counts.get(item_id, 0)
+        self._slots += -(-count // stack_size) - -(-count // current)
+        if stack_size == 1:
+            del self._stacks[item_id]
+        else:
+            self._stacks[item_id] = stack_size
+
+    def slots_needed(self, item_id, quantity=1, stack_size=None):
+        """Extra slots that adding `quantity` copies of an item would take."""
+        if stack_size is None:
+            stack_size = self._stacks.get(item_id, ITEM_STACK_SIZES.get(item_id, 1))
+        count = self._counts.get(item_id, 0)
+        return -(-(count + quantity) // stack_size) - -(-count // stack_size)
+
+    def clear(self):
+        self._counts.clear()
+        self._size = 0
+        self._slots = 0
+
+    def copy(self):
+        inventory = Inventory()
+        inventory._counts = dict(self._counts)
+        inventory._size = self._size
+        inventory._stacks = dict(self._stacks)
+        inventory._slots = self._slots
+        return inventory
+
+    def items(self):
+        """(item_id, count) pairs, one per distinct item."""
+        return self._counts.items()
+
+    def __contains__(self, item_id):
+        return item_id in self._counts
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for item_id, count in self._counts.items():
+            for _ in range(count):
+                yield item_id
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (Inventory, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Inventory({list(self)!r})"
+
+
+def get_inventory(character):
+    """Return the character's Inventory, converting a plain list on first use."""
+    inventory = character.get("inventory")
+    if not isinstance(inventory, Inventory):
+        inventory = Inventory(inventory or ())
+        character["inventory"] = inventory
+    return inventory
+
+
+def get_inventory_capacity(character):
+    """Return the character's inventory capacity in slots."""
+    return character.get("inventory_capacity", MAX_INVENTORY_SIZE)
+
+
+def set_item_stack_sizes(items):
+    """
+    Remember each item's stack size (its optional "stack_size" field) so
+    inventories can stack it even when no item data is passed in.
+    """
+    ITEM_STACK_SIZES.clear()
+    for item_id, item in items.items():
+        stack_size = item.get("stack_size", 1)
+        if stack_size > 1:
+            ITEM_STACK_SIZES[item_id] = stack_size
+
+
+def set_item_data(items):
+    """
+    Register the item catalog: stack sizes (see set_item_stack_sizes) and
+    the bonuses of equippable items, used when a save lacks them.
+    """
+    set_item_stack_sizes(items)
+    ITEM_BONUSES.clear()
+    for item_id, item in items.items():
+        if item["type"] != "consumable":
+            ITEM_BONUSES[item_id] = get_item_bonuses(item)
+
+
+def _ensure_room(character, inventory, item_id, item_data=None, message="Inventory is full."):
+    """Raise InventoryFullError unless one more copy of the item fits."""
+    stack_size = None
+    if item_data is not None:
+        stack_size = item_data.get("stack_size", 1)
+        inventory.set_stack_size(item_id, stack_size)
+    needed = inventory.slots_needed(item_id, 1, stack_size)
+    if needed and inventory.slots + needed > get_inventory_capacity(character):
+        raise InventoryFullError(message)
+
+
 # ============================================================================
 # INVENTORY MANAGEMENT
 # ============================================================================
 
-def add_item_to_inventory(character, item_id):
-    """Add an item to the character's inventory."""
-    if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-        raise InventoryFullError("Inventory is full.")
+def add_item_to_inventory(character, item_id, item_data=None):
+    """
+    Add an item to the character's inventory. Pass item_data to stack the
+    item by its "stack_size".
+    """
+    inventory = get_inventory(character)
+    _ensure_room(character, inventory, item_id, item_data)
 
-    character["inventory"].append(item_id)
+    inventory.append(item_id)
     return True
 
 
 def remove_item_from_inventory(character, item_id):
     """Remove an item from inventory."""
-    if item_id not in character["inventory"]:
+    inventory = get_inventory(character)
+    if item_id not in inventory:
         raise ItemNotFoundError(f"Item '{item_id}' not found in inventory.")
 
-    character["inventory"].remove(item_id)
+    inventory.remove(item_id)
     return True
 
 
 def has_item(character, item_id):
     """Check if character has the item."""
-    return item_id in character["inventory"]
+    return item_id in get_inventory(character)
 
 
 def count_item(character, item_id):
     """Return number of copies of item."""
-    return character["inventory"].count(item_id)
+    return get_inventory(character).count(item_id)
 
 
 def get_inventory_space_remaining(character):
     """Return available inventory slots."""
-    return MAX_INVENTORY_SIZE - len(character["inventory"])
+    return get_inventory_capacity(character) - get_inventory(character).slots
 
 
 def clear_inventory(character):
     """Remove all items and return the list of removed items."""
-    removed = character["inventory"][:]
-    character["inventory"].clear()
+    inventory = get_inventory(character)
+    removed = list(inventory)
+    inventory.clear()
     return removed
 
 
@@ -69,131 +264,223 @@ def clear_inventory(character):
 
 def use_item(character, item_id, item_data):
     """Use a consumable item."""
-    if item_id not in character["inventory"]:
+    inventory = get_inventory(character)
+    if item_id not in inventory:
         raise ItemNotFoundError(f"Item '{item_id}' not found in inventory.")
 
     if item_data["type"] != "consumable":
         raise InvalidItemTypeError("Item is not a consumable and cannot be used.")
 
-    stat_name, value = parse_item_effect(item_data["effect"])
-    apply_stat_effect(character, stat_name, value)
+    effects = parse_item_effects(item_data["effect"])
+    for stat_name, value in effects:
+        apply_stat_effect(character, stat_name, value)
 
-    character["inventory"].remove(item_id)
+    inventory.remove(item_id)
 
-    return f"Used {item_data['name']}: {stat_name} increased by {value}."
+    return f"Used {item_data['name']}: {_describe_effects(effects)}."
 
 
-def equip_weapon(character, item_id, item_data):
-    """Equip a weapon."""
-    if item_id not in character["inventory"]:
-        raise ItemNotFoundError("Weapon not found in inventory.")
+def equip_item(character, item_id, item_data, slot=None):
+    """
+    Equip an item in an equipment slot, returning whatever was in the slot
+    to inventory. slot defaults to the item's SLOT field, else its type.
+    """
+    slot = slot or item_data.get("slot") or item_data["type"]
+    _equip(character, slot, item_id, item_data)
+    return f"Equipped {slot}: {item_data.get('name', item_id)}"
 
-    if item_data["type"] != "weapon":
-        raise InvalidItemTypeError("Item is not a weapon.")
 
-    # Unequip previous weapon
-    if character.get("equipped_weapon"):
-        prev_id = character["equipped_weapon"]
-        prev_data = character["all_items"][prev_id]
-        stat, val = parse_item_effect(prev_data["effect"])
-        apply_stat_effect(character, stat, -val)
+def unequip_item(character, slot):
+    """Unequip the item in slot and return it to inventory (its ID, or None)."""
+    return _unequip(character, slot)
 
-        if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-            raise InventoryFullError("Cannot unequip: Inventory full.")
-        character["inventory"].append(prev_id)
 
-    # Equip new weapon
-    stat, val = parse_item_effect(item_data["effect"])
-    apply_stat_effect(character, stat, val)
-
-    character["equipped_weapon"] = item_id
-    character["inventory"].remove(item_id)
-
-    return f"Equipped weapon: {item_data['name']}"
+def equip_weapon(character, item_id, item_data):
+    """Equip a weapon."""
+    _equip(character, "weapon", item_id, item_data, item_type="weapon")
+    return f"Equipped weapon: {item_data.get('name', item_id)}"
 
 
 def equip_armor(character, item_id, item_data):
     """Equip armor."""
-    if item_id not in character["inventory"]:
-        raise ItemNotFoundError("Armor not found in inventory.")
-
-    if item_data["type"] != "armor":
-        raise InvalidItemTypeError("Item is not armor.")
-
-    # Unequip previous armor
-    if character.get("equipped_weapon"):
-        prev_id = character["equipped_weapon"]
-        all_items = character.get("all_items", {})  # ensure all_items exists
-        prev_data = all_items.get(prev_id)  # safely get the previous weapon
-        if prev_data:  # only proceed if the item exists
-            stat, val = parse_item_effect(prev_data["effect"])
-            apply_stat_effect(character, stat, -val)
-        else:
-            print(f"Warning: Equipped weapon ID '{prev_id}' not found in all_items.")
-
-        if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-            raise InventoryFullError("Cannot unequip: Inventory full.")
-        character["inventory"].append(prev_id)
-
-    # Equip new armor
-    stat, val = parse_item_effect(item_data["effect"])
-    apply_stat_effect(character, stat, val)
-
-    character["equipped_armor"] = item_id
-    character["inventory"].remove(item_id)
-
-    return f"Equipped armor: {item_data['name']}"
+    _equip(character, "armor", item_id, item_data, item_type="armor")
+    return f"Equipped armor: {item_data.get('name', item_id)}"
 
 
 def unequip_weapon(character):
     """Unequip weapon and return to inventory."""
-    weapon_id = character.get("equipped_weapon")
-    if not weapon_id:
-        return None
-
-    inventory = character.setdefault("inventory", [])
-
-    if len(inventory) >= MAX_INVENTORY_SIZE:
-        raise InventoryFullError("Inventory full.")
-
-    # Safely get weapon data
-    all_items = character.get("all_items", {})
-    weapon_data = all_items.get(weapon_id)
-    if not weapon_data:
-        raise ValueError(f"Weapon ID '{weapon_id}' not found in all_items.")
-
-    # Remove weapon's stat effects
-    stat, val = parse_item_effect(weapon_data["effect"])
-    apply_stat_effect(character, stat, -val)
-
-    # Add weapon back to inventory
-    if weapon_id not in inventory:
-        inventory.append(weapon_id)
-
-    # Unequip weapon
-    character["equipped_weapon"] = None
-
-    return weapon_id
+    return _unequip(character, "weapon")
 
 
 def unequip_armor(character):
     """Unequip armor and return to inventory."""
-    armor_id = character.get("equipped_armor")
-    if not armor_id:
+    return _unequip(character, "armor")
+
+
+def get_equipment(character):
+    """Return the character's {slot: item_id} map of equipped items."""
+    character["equipment"] = equipped_items(character)
+    return character["equipment"]
+
+
+def equipped_items(character):
+    """Return a new {slot: item_id} dict without changing the character."""
+    equipment = dict(character.get("equipment") or {})
+    for slot in MIRRORED_SLOTS:
+        if f"equipped_{slot}" in character:
+            if character[f"equipped_{slot}"]:
+                equipment[slot] = character[f"equipped_{slot}"]
+            else:
+                equipment.pop(slot, None)
+    return equipment
+
+
+def _equip(character, slot, item_id, item_data, item_type=None):
+    inventory = get_inventory(character)
+    if item_id not in inventory:
+        raise ItemNotFoundError(f"{slot.capitalize()} not found in inventory.")
+
+    if item_type and item_data["type"] != item_type:
+        raise InvalidItemTypeError(f"Item is not {'a weapon' if item_type == 'weapon' else 'armor'}.")
+    if item_data["type"] == "consumable":
+        raise InvalidItemTypeError("Consumables cannot be equipped.")
+    if not SLOT_FORMAT.fullmatch(slot):
+        raise InvalidItemTypeError(f"Invalid equipment slot: {slot}")
+
+    bonuses = get_item_bonuses(item_data)
+    for stat, value in zip(STAT_NAMES, bonuses):
+        if value and stat not in DERIVED_STATS:
+            raise InvalidItemTypeError(f"Invalid equipment stat: {stat}")
+
+    # Base stats must be known before the bonuses change
+    get_base_stats(character)
+    equipment = get_equipment(character)
+    inventory.remove(item_id)
+    previous = equipment.get(slot)
+    if previous:
+        try:
+            _ensure_room(character, inventory, previous, message="Cannot unequip: Inventory full.")
+        except InventoryFullError:
+            inventory.append(item_id)
+            raise
+        inventory.append(previous)
+
+    _set_equipped(character, slot, item_id)
+    # The bonus vector is stored with the character, so unequipping never
+    # needs the item data again
+    character.setdefault("equipment_bonuses", {})[slot] = bonuses
+    recompute_stats(character)
+
+
+def _unequip(character, slot):
+    item_id = get_equipment(character).get(slot)
+    if not item_id:
         return None
 
-    if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-        raise InventoryFullError("Inventory full.")
+    get_base_stats(character)
+    inventory = get_inventory(character)
+    _ensure_room(character, inventory, item_id, message="Inventory full.")
+
+    inventory.append(item_id)
+    _set_equipped(character, slot, None)
+    character.get("equipment_bonuses", {}).pop(slot, None)
+    recompute_stats(character)
 
-    armor_data = character["all_items"][armor_id]
-    stat, val = parse_item_effect(armor_data["effect"])
+    return item_id
 
-    apply_stat_effect(character, stat, -val)
 
-    character["inventory"].append(armor_id)
-    character["equipped_armor"] = None
+def _set_equipped(character, slot, item_id):
+    equipment = character["equipment"]
+    if item_id:
+        equipment[slot] = item_id
+    else:
+        equipment.pop(slot, None)
+    if slot in MIRRORED_SLOTS:
+        character[f"equipped_{slot}"] = item_id
 
-    return armor_id
+
+# ============================================================================
+# STATS
+# ============================================================================
+# character["base_stats"] holds the stats without equipment; the plain
+# character["strength"] etc. are the cached effective values (base plus
+# equipment bonuses) that combat reads directly. They are recomputed only
+# when equipment changes, and stats_version counts those changes.
+# character["equipment_bonuses"] maps each slot to the bonus vector (one
+# value per STAT_NAMES entry) of the item in it.
+
+def get_base_stats(character):
+    """Return the character's base stats, deriving them on first use."""
+    base = character.get("base_stats")
+    if base is None:
+        _fill_missing_bonuses(character)
+        bonuses = dict(zip(STAT_NAMES, get_equipment_bonuses(character)))
+        base = {stat: character[stat] - bonuses[stat]
+                for stat in DERIVED_STATS if stat in character}
+        character["base_stats"] = base
+    return base
+
+
+def _fill_missing_bonuses(character):
+    # Saves from before bonuses were stored only name the equipped items;
+    # their stats include those bonuses, so they must be known to find the
+    # base stats
+    stored = character.setdefault("equipment_bonuses", {})
+    for slot, item_id in equipped_items(character).items():
+        if slot not in stored:
+            if item_id not in ITEM_BONUSES:
+                raise ItemNotFoundError(
+                    f"No item data for equipped item '{item_id}'; register it with set_item_data().")
+            stored[slot] = ITEM_BONUSES[item_id]
+
+
+def get_equipment_bonuses(character):
+    """Return the summed bonus vector of everything equipped."""
+    total = NO_BONUSES
+    for bonuses in character.get("equipment_bonuses", {}).values():
+        total = tuple(map(add, total, bonuses))
+    return total
+
+
+def get_item_bonuses(item_data):
+    """
+    Return an item's effect as a bonus vector. game_data.Item records
+    carry it precomputed; plain item dicts are parsed here.
+    """
+    bonuses = getattr(item_data, "bonuses", None)
+    if bonuses is not None:
+        return bonuses
+    try:
+        return effect_vector(parse_item_effects(item_data["effect"]))
+    except ValueError as e:
+        raise InvalidItemTypeError(str(e))
+
+
+def recompute_stats(character):
+    """Refresh the effective stats from base stats and equipment bonuses."""
+    bonuses = dict(zip(STAT_NAMES, get_equipment_bonuses(character)))
+    for stat, value in get_base_stats(character).items():
+        character[stat] = value + bonuses[stat]
+    _clamp_health(character)
+    character["stats_version"] = character.get("stats_version", 0) + 1
+
+
+def adjust_base_stat(character, stat_name, amount):
+    """
+    Permanently change a stat (level-ups, stat potions). Base and effective
+    values move by the same amount, so nothing needs recomputing.
+    """
+    base = get_base_stats(character)
+    base[stat_name] = base.get(stat_name, character[stat_name]) + amount
+    character[stat_name] += amount
+    _clamp_health(character)
+    character["stats_version"] = character.get("stats_version", 0) + 1
+
+
+def _clamp_health(character):
+    if "health" in character and "max_health" in character:
+        if character["health"] > character["max_health"]:
+            character["health"] = character["max_health"]
 
 
 # ============================================================================
@@ -205,45 +492,197 @@ def purchase_item(character, item_id, item_data):
     if character["gold"] < item_data["cost"]:
         raise InsufficientResourcesError("Not enough gold.")
 
-    if len(character["inventory"]) >= MAX_INVENTORY_SIZE:
-        raise InventoryFullError("Inventory full.")
+    inventory = get_inventory(character)
+    _ensure_room(character, inventory, item_id, item_data, message="Inventory full.")
 
     character["gold"] -= item_data["cost"]
-    character["inventory"].append(item_id)
+    inventory.append(item_id)
 
     return True
 
 
 def sell_item(character, item_id, item_data):
     """Sell an item for half its value."""
-    if item_id not in character["inventory"]:
+    inventory = get_inventory(character)
+    if item_id not in inventory:
         raise ItemNotFoundError("Item not in inventory.")
 
     sell_price = item_data["cost"] // 2
     character["gold"] += sell_price
-    character["inventory"].remove(item_id)
+    inventory.remove(item_id)
 
     return sell_price
 
 
+# ============================================================================
+# TRANSACTIONS
+# ============================================================================
+
+class InventoryTransaction:
+    """
+    A batch of buy/sell/use operations on one character. Operations are only
+    queued; commit() checks the whole batch against gold, item counts and
+    capacity once, then applies all of it or nothing.
+    """
+
+    def __init__(self, character):
+        self.character = character
+        self.results = []
+        self._operations = []
+
+    def buy(self, item_id, item_data, quantity=1):
+        _check_quantity(quantity)
+        self._operations.append(("buy", item_id, item_data, quantity))
+        return self
+
+    def sell(self, item_id, item_data, quantity=1):
+        _check_quantity(quantity)
+        self._operations.append(("sell", item_id, item_data, quantity))
+        return self
+
+    def use(self, item_id, item_data, quantity=1):
+        _check_quantity(quantity)
+        if item_data["type"] != "consumable":
+            raise InvalidItemTypeError("Item is not a consumable and cannot be used.")
+        for stat, _ in parse_item_effects(item_data["effect"]):
+            if stat not in STAT_NAMES:
+                raise InvalidItemTypeError(f"Invalid stat: {stat}")
+        self._operations.append(("use", item_id, item_data, quantity))
+        return self
+
+    def commit(self):
+        """
+        Validate and apply every queued operation. Returns one result per
+        operation (cost paid, gold received, or the use message).
+        Raises: ItemNotFoundError, InsufficientResourcesError, InventoryFullError
+        """
+        character = self.character
+        inventory = get_inventory(character)
+
+        # Item counts in queue order (an item must be held before it is sold
+        # or used) and the net change in gold, in one pass
+        counts = {}
+        stack_sizes = {}
+        gold = character["gold"]
+        for kind, item_id, item_data, quantity in self._operations:
+            stack_sizes[item_id] = item_data.get("stack_size", 1)
+            count = counts[item_id] if item_id in counts else inventory.count(item_id)
+            if kind == "buy":
+                counts[item_id] = count + quantity
+                gold -= item_data["cost"] * quantity
+            else:
+                if count < quantity:
+                    raise ItemNotFoundError(f"Not enough '{item_id}' in inventory.")
+                counts[item_id] = count - quantity
+                if kind == "sell":
+                    gold += item_data["cost"] // 2 * quantity
+
+        for item_id, stack_size in stack_sizes.items():
+            inventory.set_stack_size(item_id, stack_size)
+        slots = inventory.slots
+        for item_id, count in counts.items():
+            stack_size = stack_sizes[item_id]
+            slots += -(-count // stack_size) - -(-inventory.count(item_id) // stack_size)
+        if gold < 0:
+            raise InsufficientResourcesError("Not enough gold.")
+        if slots > get_inventory_capacity(character):
+            raise InventoryFullError("Inventory full.")
+
+        saved = {key: character[key] for key in ("gold", "stats_version", *STAT_NAMES)
+                 if key in character}
+        saved["inventory"] = inventory.copy()
+        if "base_stats" in character:
+            saved["base_stats"] = dict(character["base_stats"])
+        try:
+            self.results = [self._apply(inventory, *operation) for operation in self._operations]
+        except Exception:
+            character.pop("base_stats", None)
+            character.update(saved)
+            raise
+        self._operations = []
+        return self.results
+
+    def _apply(self, inventory, kind, item_id, item_data, quantity):
+        character = self.character
+        if kind == "buy":
+            for _ in range(quantity):
+                inventory.append(item_id)
+            character["gold"] -= item_data["cost"] * quantity
+            return item_data["cost"] * quantity
+        if kind == "sell":
+            for _ in range(quantity):
+                inventory.remove(item_id)
+            character["gold"] += item_data["cost"] // 2 * quantity
+            return item_data["cost"] // 2 * quantity
+        effects = parse_item_effects(item_data["effect"])
+        for _ in range(quantity):
+            inventory.remove(item_id)
+            for stat, value in effects:
+                apply_stat_effect(character, stat, value)
+        effects = [(stat, value * quantity) for stat, value in effects]
+        return f"Used {item_data['name']} x{quantity}: {_describe_effects(effects)}."
+
+
+def _check_quantity(quantity):
+    if quantity.__class__ is not int or quantity < 1:
+        raise ValueError(f"Quantity must be a positive integer: {quantity!r}")
+
+
+@contextmanager
+def inventory_transaction(character):
+    """
+    Queue operations and apply them together when the block exits:
+
+        with inventory_transaction(character) as tx:
+            tx.buy("health_potion", items["health_potion"], 3)
+            tx.sell("iron_sword", items["iron_sword"])
+
+    If the block raises, or the batch fails validation, nothing changes.
+    """
+    transaction = InventoryTransaction(character)
+    yield transaction
+    transaction.commit()
+
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
 def parse_item_effect(effect_string):
-    """Convert 'stat:value' into ('stat', int(value))."""
+    """
+    Convert a single 'stat:value' effect into ('stat', int(value)).
+    Use parse_item_effects for effects that may change several stats.
+    """
+    effects = parse_item_effects(effect_string)
+    if len(effects) != 1:
+        raise InvalidItemTypeError(f"Invalid effect format: {effect_string}")
+    return effects[0]
+
+
+def parse_item_effects(effect_string):
+    """
+    Convert 'stat:value[,stat:value...]' into (('stat', value), ...).
+    Effects already parsed by game_data.Item are returned unchanged.
+    """
     try:
-        stat, val = effect_string.split(":")
-        return stat, int(val)
-    except:
+        return parse_effects(effect_string)
+    except (TypeError, ValueError):
         raise InvalidItemTypeError(f"Invalid effect format: {effect_string}")
 
 
+def _describe_effects(effects):
+    return ", ".join(f"{stat} increased by {value}" for stat, value in effects)
+
+
 def apply_stat_effect(character, stat_name, value):
     """Modify character stats."""
-    if stat_name not in ["health", "max_health", "strength", "magic"]:
+    if stat_name not in STAT_NAMES:
         raise InvalidItemTypeError(f"Invalid stat: {stat_name}")
 
+    if stat_name in DERIVED_STATS:
+        adjust_base_stat(character, stat_name, value)
+        return
+
     character[stat_name] += value
 
     if stat_name == "health":
@@ -253,18 +692,13 @@ def apply_stat_effect(character, stat_name, value):
 
 def display_inventory(character, item_data_dict):
     """Display inventory with item names and counts."""
-    if not character["inventory"]:
+    inventory = get_inventory(character)
+    if not inventory:
         return "Inventory is empty."
 
     output = []
-    counted = set()
-
-    for item_id in character["inventory"]:
-        if item_id in counted:
-            continue
-        counted.add(item_id)
 
-        count = character["inventory"].count(item_id)
+    for item_id, count in inventory.items():
         item = item_data_dict[item_id]
 
         output.append(f"{item['name']} (x{count}) – {item['type']}")
@@ -27,6 +27,10 @@ current_character = None
 all_quests = {}
 all_items = {}
 game_running = False
+data_reloaders = []
+
+# Saves after every action are coalesced and written in the background
+save_manager = character_manager.WriteBehindSaver()
 
 
 # ============================================================================
@@ -207,28 +211,66 @@ def save_game():
     """Save current game state"""
     global current_character
 
-    # TODO: Implement save
-    # Use character_manager.save_character()
-    # Handle any file I/O exceptions
-    pass
+    if current_character is None:
+        return False
+    # Cheap enough to call after every action; the disk write happens later
+    save_manager.mark_dirty(current_character)
+    return True
+
+
+def flush_saves():
+    """Write any pending saves to disk now (quit, death, shutdown)"""
+    try:
+        save_manager.flush()
+        return True
+    except (OSError, GameError) as e:
+        print(f"Warning: could not save game: {e}")
+        return False
 
 
 def load_game_data():
     """Load all quest and item data from files"""
     global all_quests, all_items
 
-    # TODO: Implement data loading
-    # Try to load quests with game_data.load_quests()
-    # Try to load items with game_data.load_items()
-    # Handle MissingDataFileError, InvalidDataFormatError
-    # If files missing, create defaults with game_data.create_default_data_files()
-    pass
+    # MissingDataFileError and InvalidDataFormatError are handled by main()
+    all_quests = game_data.load_quests()
+    all_items = game_data.load_items()
+    inventory_system.set_item_data(all_items)
+
+
+def start_data_reload(interval=1.0):
+    """
+    Watch the data files and apply edits to all_quests/all_items in place,
+    so a running game picks up new or changed content without a restart.
+    """
+    global data_reloaders
+
+    stop_data_reload()
+    data_reloaders = [
+        game_data.DataReloader("data/quests.txt", "quest", all_quests),
+        game_data.DataReloader("data/items.txt", "item", all_items),
+    ]
+    for reloader in data_reloaders:
+        reloader.start(interval)
+    return data_reloaders
+
+
+def stop_data_reload():
+    """Stop any data file watchers started by start_data_reload()"""
+    global data_reloaders
+
+    for reloader in data_reloaders:
+        reloader.stop()
+    data_reloaders = []
 
 
 def handle_character_death():
     """Handle character death"""
     global current_character, game_running
 
+    # Never lose progress to a death, whatever the player picks next
+    flush_saves()
+
     # TODO: Implement death handling
     # Display death message
     # Offer: Revive (costs gold) or Quit
@@ -279,6 +321,8 @@ def main():
         elif choice == 2:
             load_game()
         elif choice == 3:
+            flush_saves()
+            save_manager.close()
             print("\nThanks for playing Quest Chronicles!")
             break
         else:
@@ -0,0 +1,544 @@
+"""
+Test Data Pipeline
+Tests the streaming, cached and alternate loaders in game_data
+"""
+
+import json
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from custom_exceptions import *
+import game_data
+
+ITEM_BLOCK = """ITEM_ID: {item_id}
+NAME: Item {item_id}
+TYPE: consumable
+EFFECT: health:{value}
+COST: {value}
+DESCRIPTION: Generated test item
+"""
+
+
+def write_items(path, count, start=0):
+    """Write `count` generated item blocks to path"""
+    blocks = [ITEM_BLOCK.format(item_id=f"item_{i}", value=i + 1)
+              for i in range(start, start + count)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(blocks))
+    return str(path)
+
+# ============================================================================
+# STREAMING LOADER TESTS
+# ============================================================================
+
+def test_iter_items_yields_validated_records(tmp_path):
+    """Test that iter_items yields one record per block"""
+    path = write_items(tmp_path / "items.txt", 5)
+
+    items = list(game_data.iter_items(path))
+
+    assert [item['item_id'] for item in items] == [f"item_{i}" for i in range(5)]
+    assert items[2]['cost'] == 3
+
+def test_iter_items_matches_load_items():
+    """Test that streaming and dict loaders agree on the shipped data"""
+    streamed = {item['item_id']: item for item in game_data.iter_items("data/items.txt")}
+    assert streamed == game_data.load_items("data/items.txt")
+
+def test_iter_quests_is_lazy(tmp_path):
+    """Test that a bad block is only reported when it is reached"""
+    path = tmp_path / "quests.txt"
+    path.write_text(
+        "QUEST_ID: ok\nTITLE: Ok\nDESCRIPTION: d\nREWARD_XP: 1\n"
+        "REWARD_GOLD: 1\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n\n"
+        "QUEST_ID: bad\nREWARD_XP: lots\n"
+    )
+
+    quests = game_data.iter_quests(str(path))
+    assert next(quests)['quest_id'] == "ok"
+    with pytest.raises(InvalidDataFormatError):
+        next(quests)
+
+def test_iter_items_missing_file():
+    """Test that MissingDataFileError is raised for missing files"""
+    with pytest.raises(MissingDataFileError):
+        list(game_data.iter_items("nonexistent_items.txt"))
+
+# ============================================================================
+# CACHE TESTS
+# ============================================================================
+
+def test_cache_written_and_reused(tmp_path):
+    """Test that a second load is served from the cache"""
+    path = write_items(tmp_path / "items.txt", 3)
+
+    first = game_data.load_items(path)
+    cache_path = game_data.get_cache_path(path)
+    assert os.path.exists(cache_path)
+    assert cache_path == str(tmp_path / ".cache" / "items.bin")
+
+    assert game_data.read_data_cache(path) == first
+    assert game_data.load_items(path) == first
+
+def test_cache_invalidated_when_source_changes(tmp_path):
+    """Test that editing the data file forces a re-parse"""
+    path = write_items(tmp_path / "items.txt", 3)
+    game_data.load_items(path)
+
+    write_items(path, 4)
+    os.utime(path, ns=(1, 1))
+
+    assert game_data.read_data_cache(path) is None
+    assert len(game_data.load_items(path)) == 4
+
+def test_corrupted_cache_falls_back_to_parse(tmp_path):
+    """Test that a damaged cache is ignored and rebuilt"""
+    path = write_items(tmp_path / "items.txt", 3)
+    game_data.load_items(path)
+
+    with open(game_data.get_cache_path(path), "wb") as f:
+        f.write(b"not a cache")
+
+    assert len(game_data.load_items(path)) == 3
+    assert game_data.read_data_cache(path) is not None
+
+# ============================================================================
+# MEMORY-MAPPED CATALOG TESTS
+# ============================================================================
+
+def test_item_catalog_matches_load_items():
+    """Test that the mapped catalog decodes the same items as load_items"""
+    items = game_data.load_items("data/items.txt", use_cache=False)
+
+    with game_data.open_item_catalog("data/items.txt") as catalog:
+        assert len(catalog) == len(items)
+        assert set(catalog) == set(items)
+        assert catalog['iron_sword'] == items['iron_sword']
+        assert 'missing_item' not in catalog
+        with pytest.raises(KeyError):
+            catalog['missing_item']
+
+def test_item_catalog_works_with_display_inventory():
+    """Test that the catalog is a drop-in item_data_dict"""
+    import inventory_system
+
+    char = {'inventory': ['health_potion', 'health_potion', 'iron_sword']}
+    with game_data.open_item_catalog("data/items.txt") as catalog:
+        text = inventory_system.display_inventory(char, catalog)
+
+    assert "Health Potion (x2)" in text
+    assert "Iron Sword (x1)" in text
+
+def test_item_catalog_rebuilt_when_source_changes(tmp_path):
+    """Test that a stale pack is rebuilt"""
+    path = write_items(tmp_path / "items.txt", 2)
+    with game_data.open_item_catalog(path) as catalog:
+        assert len(catalog) == 2
+
+    write_items(path, 5)
+    with game_data.open_item_catalog(path) as catalog:
+        assert len(catalog) == 5
+        assert catalog['item_4']['cost'] == 5
+
+# ============================================================================
+# SHARDED LOADER TESTS
+# ============================================================================
+
+def test_load_item_shards_merges_directory(tmp_path):
+    """Test that every shard in a directory is loaded in parallel"""
+    for shard in range(3):
+        write_items(tmp_path / f"items_{shard}.txt", 4, start=shard * 4)
+
+    items = game_data.load_item_shards(str(tmp_path), workers=2)
+
+    assert len(items) == 12
+    assert items['item_11']['cost'] == 12
+
+def test_load_item_shards_accepts_glob(tmp_path):
+    """Test that a glob pattern selects shards"""
+    write_items(tmp_path / "a.txt", 2)
+    write_items(tmp_path / "b.txt", 2, start=2)
+    write_items(tmp_path / "skip.dat", 2, start=4)
+
+    items = game_data.load_item_shards(str(tmp_path / "*.txt"), workers=1)
+    assert sorted(items) == [f"item_{i}" for i in range(4)]
+
+def test_load_item_shards_reports_duplicates(tmp_path):
+    """Test that duplicate IDs across shards name the file and line"""
+    write_items(tmp_path / "a.txt", 2)
+    write_items(tmp_path / "b.txt", 2, start=1)
+
+    with pytest.raises(InvalidDataFormatError) as error:
+        game_data.load_item_shards(str(tmp_path), workers=2)
+
+    message = str(error.value)
+    assert "item_1" in message
+    assert "b.txt line 1" in message
+    assert "a.txt line 8" in message
+
+def test_load_item_shards_missing():
+    """Test that an empty match raises MissingDataFileError"""
+    with pytest.raises(MissingDataFileError):
+        game_data.load_item_shards("no_such_dir/*.txt")
+
+# ============================================================================
+# HOT RELOAD TESTS
+# ============================================================================
+
+def test_reloader_applies_block_diff(tmp_path):
+    """Test that added, changed and removed items are applied in place"""
+    path = write_items(tmp_path / "items.txt", 3)
+    reloader = game_data.DataReloader(path, "item")
+    items = reloader.records
+    events = []
+    reloader.subscribe(lambda added, changed, removed: events.append((added, changed, removed)))
+
+    text = open(path).read()
+    text = text.replace("COST: 2\n", "COST: 200\n")
+    text = text.replace("ITEM_ID: item_0", "ITEM_ID: item_9")
+    with open(path, "w") as f:
+        f.write(text)
+    os.utime(path, ns=(1, 1))
+
+    added, changed, removed = reloader.reload()
+
+    assert (added, changed, removed) == ({'item_9'}, {'item_1'}, {'item_0'})
+    assert events == [(added, changed, removed)]
+    assert items['item_1']['cost'] == 200
+    assert 'item_0' not in items and 'item_9' in items
+
+def test_reloader_only_parses_changed_blocks(tmp_path, monkeypatch):
+    """Test that unchanged blocks are not parsed again"""
+    path = write_items(tmp_path / "items.txt", 50)
+    items = game_data.load_items(path, use_cache=False)
+    reloader = game_data.DataReloader(path, "item", items)
+
+    calls = []
+    original = game_data.parse_item_block
+    monkeypatch.setattr(game_data, "parse_item_block", lambda lines: calls.append(lines) or original(lines))
+
+    with open(path, "a") as f:
+        f.write("\n" + ITEM_BLOCK.format(item_id="extra", value=7))
+
+    assert reloader.reload() == ({'extra'}, set(), set())
+    assert len(calls) == 1
+    assert items['extra']['cost'] == 7
+
+def test_reloader_keeps_data_on_invalid_edit(tmp_path):
+    """Test that a bad edit raises and leaves records untouched"""
+    path = write_items(tmp_path / "items.txt", 2)
+    reloader = game_data.DataReloader(path, "item")
+
+    with open(path, "a") as f:
+        f.write("\nITEM_ID: broken\nCOST: lots\n")
+
+    with pytest.raises(InvalidDataFormatError):
+        reloader.reload()
+    assert sorted(reloader.records) == ['item_0', 'item_1']
+
+def test_reloader_resplits_only_edited_region(tmp_path, monkeypatch):
+    """Test that an edit deep in a large file only re-reads its region"""
+    monkeypatch.setattr(game_data.DataReloader, "REGION_SIZE", 512)
+    path = write_items(tmp_path / "items.txt", 200)
+    reloader = game_data.DataReloader(path, "item")
+    items = reloader.records
+
+    split = []
+    original_split = game_data._split_blocks
+    monkeypatch.setattr(game_data, "_split_blocks",
+                        lambda buffer, line=1: split.append(buffer) or original_split(buffer, line))
+    calls = []
+    original_parse = game_data.parse_item_block
+    monkeypatch.setattr(game_data, "parse_item_block", lambda lines: calls.append(lines) or original_parse(lines))
+
+    text = open(path).read()
+    text = text.replace("COST: 101\n", "COST: 5000\n")
+    text = text.replace(ITEM_BLOCK.format(item_id="item_102", value=103) + "\n", "")
+    with open(path, "w") as f:
+        f.write(text)
+    os.utime(path, ns=(1, 1))
+
+    assert reloader.reload() == (set(), {'item_100'}, {'item_102'})
+    assert len(calls) == 1
+    assert sum(map(len, split)) < len(text) // 10
+    assert items['item_100']['cost'] == 5000 and 'item_102' not in items
+
+    # Line numbers still count the regions that were skipped
+    with open(path, "w") as f:
+        f.write(text.replace("COST: 5000\n", "COST: lots\n"))
+    os.utime(path, ns=(2, 2))
+    with pytest.raises(InvalidDataFormatError, match=f"line {100 * 7 + 1}:"):
+        reloader.reload()
+    assert items['item_100']['cost'] == 5000
+
+# ============================================================================
+# RECORD TYPE TESTS
+# ============================================================================
+
+def test_item_records_support_dict_access():
+    """Test that Item records behave like the old item dicts"""
+    items = game_data.load_items("data/items.txt", use_cache=False)
+    sword = items['iron_sword']
+
+    assert isinstance(sword, game_data.Item)
+    assert not hasattr(sword, '__dict__')
+    assert sword['name'] == "Iron Sword"
+    assert sword.get('missing', 'default') == 'default'
+    assert 'cost' in sword and 'missing' not in sword
+    assert sword['effect'] == (('strength', 5),)
+    assert sword.bonuses == (0, 0, 5, 0)
+    assert sword.to_dict()['effect'] == "strength:5"
+
+def test_item_records_are_smaller_than_dicts():
+    """Test that a slotted record uses less memory than the dict it replaces"""
+    item = game_data.load_items("data/items.txt", use_cache=False)['steel_armor']
+    assert sys.getsizeof(item) < sys.getsizeof(item.to_dict())
+
+def test_item_records_pickle_round_trip():
+    """Test that records survive the cache's pickling"""
+    import pickle
+
+    quests = game_data.load_quests("data/quests.txt", use_cache=False)
+    assert pickle.loads(pickle.dumps(quests)) == quests
+    assert quests['first_steps'].copy()['title'] == "First Steps"
+
+def test_item_record_equips_without_reparsing():
+    """Test that the pre-parsed effect works with inventory_system"""
+    import inventory_system
+
+    sword = game_data.load_items("data/items.txt", use_cache=False)['iron_sword']
+    char = {'inventory': ['iron_sword'], 'strength': 10}
+
+    inventory_system.equip_weapon(char, 'iron_sword', sword)
+    assert char['strength'] == 15
+
+# ============================================================================
+# BATCH VALIDATION TESTS
+# ============================================================================
+
+def test_loaded_catalogs_validate_cleanly():
+    """Test that the shipped data passes the batch validators"""
+    quests = game_data.load_quests("data/quests.txt", use_cache=False)
+    items = game_data.load_items("data/items.txt", use_cache=False)
+
+    assert game_data.validate_quest_columns(game_data.quest_columns(quests)) == []
+    assert game_data.validate_item_columns(game_data.item_columns(items)) == []
+
+def test_item_column_validation_reports_every_error():
+    """Test that all bad rows are reported with their location"""
+    columns = {
+        'item_id': ['a', 'b', 'c', 'd'],
+        'name': ['A', None, 'C', 'D'],
+        'type': ['weapon', 'armor', 'shield', 'consumable'],
+        'effect': ['strength:5', 'max_health:10', 'magic:3', 'health'],
+        'cost': [10, 20, 30, -1],
+        'description': ['x', 'x', 'x', 'x'],
+    }
+
+    errors = game_data.validate_item_columns(columns)
+    found = [(error['row'], error['id'], error['field']) for error in errors]
+
+    assert found == [(1, 'b', 'name'), (2, 'c', 'type'),
+                     (3, 'd', 'effect'), (3, 'd', 'cost')]
+
+def test_item_column_validation_checks_optional_fields(tmp_path):
+    """Test that batch and per-record validation agree on stack_size and slot"""
+    base = {'name': 'A', 'type': 'armor', 'effect': 'max_health:5', 'cost': 5, 'description': 'x'}
+    records = [dict(base, item_id='a'), dict(base, item_id='b', stack_size=0),
+               dict(base, item_id='c', slot='left hand'), dict(base, item_id='d', slot='ring')]
+
+    errors = game_data.validate_item_columns(game_data.item_columns(records))
+    assert [(error['id'], error['field']) for error in errors] == [('b', 'stack_size'), ('c', 'slot')]
+
+    path = tmp_path / "items.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    problems = []
+    game_data.load_items(str(path), use_cache=False, errors=problems)
+    assert [(problem['line'], problem['field']) for problem in problems] == \
+        [(2, 'stack_size'), (3, 'slot')]
+
+def test_quest_column_validation_checks_ranges():
+    """Test integer type and range checks on quest columns"""
+    columns = game_data.quest_columns([
+        {'quest_id': 'q1', 'title': 'T', 'description': 'D', 'reward_xp': 10,
+         'reward_gold': 5, 'required_level': 0, 'prerequisite': 'NONE'},
+        {'quest_id': 'q2', 'title': 'T', 'description': 'D', 'reward_xp': '10',
+         'reward_gold': 5, 'required_level': 1},
+    ])
+
+    errors = game_data.validate_quest_columns(columns)
+    found = [(error['id'], error['field']) for error in errors]
+
+    assert found == [('q1', 'required_level'), ('q2', 'reward_xp'), ('q2', 'prerequisite')]
+
+# ============================================================================
+# COLUMNAR TABLE TESTS
+# ============================================================================
+
+def test_item_table_columns():
+    """Test that the item table holds one array entry per item"""
+    items = game_data.load_items("data/items.txt", use_cache=False)
+    table = game_data.item_table(items)
+
+    row = table['item_id'].index('fire_staff')
+    assert len(table['cost']) == len(items)
+    assert table['cost'][row] == 200
+    assert table['effect_value'][row] == 8
+    assert table['type_categories'][table['type_code'][row]] == 'weapon'
+    assert table['stat_categories'][table['stat_code'][row]] == 'magic'
+
+def test_select_items_filters_and_sorts():
+    """Test 'weapons under 200 gold sorted by strength bonus'-style queries"""
+    table = game_data.item_table(game_data.load_items("data/items.txt", use_cache=False))
+
+    assert game_data.select_items(table, "weapon", stat="strength") == ['steel_sword', 'iron_sword']
+    assert game_data.select_items(table, "weapon", stat="strength", max_cost=199) == ['iron_sword']
+    assert game_data.select_items(table, "armor", order_by="cost", descending=False) == \
+        ['leather_armor', 'magic_robe', 'steel_armor']
+    assert game_data.select_items(table, "shield") == []
+
+def test_select_items_matches_every_stat_of_an_effect():
+    """Test that stat filters and ordering see all stats of multi-stat items"""
+    items = [
+        {'item_id': 'wand', 'type': 'weapon', 'effect': 'magic:3,strength:9', 'cost': 10},
+        {'item_id': 'club', 'type': 'weapon', 'effect': 'strength:4', 'cost': 10},
+        {'item_id': 'staff', 'type': 'weapon', 'effect': 'magic:6', 'cost': 10},
+    ]
+    table = game_data.item_table(items)
+
+    assert list(table['bonus_strength']) == [9, 4, 0]
+    assert game_data.select_items(table, "weapon", stat="strength") == ['wand', 'club']
+    assert game_data.select_items(table, stat="magic") == ['staff', 'wand']
+    assert game_data.select_items(table, stat="luck") == []
+
+def test_quest_table_columns():
+    """Test the quest table's numeric columns"""
+    quests = game_data.load_quests("data/quests.txt", use_cache=False)
+    table = game_data.quest_table(quests)
+
+    row = table['quest_id'].index('dragon_slayer')
+    assert table['reward_xp'][row] == 500
+    assert table['required_level'][row] == 6
+
+# ============================================================================
+# PARTIAL LOAD TESTS
+# ============================================================================
+
+def write_items_with_errors(path):
+    """Write five items where blocks 2 and 4 are malformed"""
+    text = open(write_items(path, 5)).read()
+    text = text.replace("COST: 2\n", "COST: two\n")
+    text = text.replace("TYPE: consumable\nEFFECT: health:4", "TYPE: shield\nEFFECT: health:4")
+    with open(path, "w") as f:
+        f.write(text)
+    return str(path)
+
+def test_strict_load_reports_file_and_line(tmp_path):
+    """Test that the default mode names the offending line"""
+    path = write_items_with_errors(tmp_path / "items.txt")
+
+    with pytest.raises(InvalidDataFormatError) as error:
+        game_data.load_items(path)
+
+    assert f"{path} line 12" in str(error.value)
+    assert "cost" in str(error.value)
+
+def test_partial_load_skips_bad_blocks(tmp_path):
+    """Test that partial mode returns the good items and every error"""
+    path = write_items_with_errors(tmp_path / "items.txt")
+    errors = []
+
+    items = game_data.load_items(path, errors=errors)
+
+    assert sorted(items) == ['item_0', 'item_2', 'item_4']
+    assert errors == [
+        {'file': path, 'line': 12, 'field': 'cost', 'reason': "Field cost must be an integer."},
+        {'file': path, 'line': 24, 'field': 'type', 'reason': "Invalid item type: shield"},
+    ]
+    # A partial result must not be replayed from the cache
+    assert game_data.read_data_cache(path) is None
+
+def test_partial_load_reports_missing_fields(tmp_path):
+    """Test that a block missing a field points at the block"""
+    path = tmp_path / "quests.txt"
+    path.write_text("\n\nQUEST_ID: lonely\nTITLE: Alone\n")
+    errors = []
+
+    quests = game_data.load_quests(str(path), errors=errors)
+
+    assert quests == {}
+    assert errors[0]['line'] == 3
+    assert errors[0]['field'] == 'description'
+
+# ============================================================================
+# DATA FORMAT TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("extension", [".txt", ".jsonl", ".qcb"])
+def test_formats_round_trip(tmp_path, extension):
+    """Test that every registered format loads back the same records"""
+    items = game_data.load_items("data/items.txt", use_cache=False)
+    quests = game_data.load_quests("data/quests.txt", use_cache=False)
+
+    game_data.write_items(items, str(tmp_path / ("items" + extension)))
+    game_data.write_quests(quests, str(tmp_path / ("quests" + extension)))
+
+    assert game_data.load_items(str(tmp_path / ("items" + extension))) == items
+    assert game_data.load_quests(str(tmp_path / ("quests" + extension))) == quests
+
+def test_convert_data_file(tmp_path):
+    """Test converting the shipped text file to JSON Lines"""
+    destination = str(tmp_path / "items.jsonl")
+
+    count = game_data.convert_data_file("data/items.txt", destination, "item")
+
+    assert count == 10
+    with open(destination) as f:
+        assert len(f.readlines()) == 10
+
+def test_json_lines_validated_with_line_numbers(tmp_path):
+    """Test that other formats share the validation and error reporting"""
+    path = tmp_path / "items.jsonl"
+    path.write_text(
+        '{"item_id": "a", "name": "A", "type": "weapon", "effect": "strength:1", "cost": 5, "description": "x"}\n'
+        '{"item_id": "b", "name": "B", "type": "weapon", "effect": "strength:1", "cost": "5", "description": "x"}\n'
+        'not json\n'
+    )
+    errors = []
+
+    items = game_data.load_items(str(path), errors=errors)
+
+    assert list(items) == ['a']
+    assert [(error['line'], error['field']) for error in errors] == [(2, 'cost'), (3, None)]
+
+def test_json_lines_wrong_value_types_skipped(tmp_path):
+    """Test that non-string, non-integer JSON values are reported per line"""
+    path = tmp_path / "items.jsonl"
+    path.write_text(
+        '{"item_id": "a", "name": "A", "type": "weapon", "effect": 5, "cost": 5, "description": "x"}\n'
+        '{"item_id": "b", "name": "B", "type": ["weapon"], "effect": "strength:1", "cost": 5, "description": "x"}\n'
+        '{"item_id": "c", "name": "C", "type": "weapon", "effect": "strength:1", "cost": true, "description": "x"}\n'
+        '{"item_id": "d", "name": "D", "type": "weapon", "effect": "strength:1", "cost": 5, "description": "x"}\n'
+    )
+    errors = []
+
+    items = game_data.load_items(str(path), use_cache=False, errors=errors)
+
+    assert list(items) == ['d']
+    assert [error['line'] for error in errors] == [1, 2, 3]
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_items(str(path), use_cache=False)
+
+def test_unknown_format_rejected(tmp_path):
+    """Test that an unregistered extension is an InvalidDataFormatError"""
+    path = tmp_path / "items.xml"
+    path.write_text("<items/>")
+
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_items(str(path))
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,449 @@
+"""
+Test Inventory
+Tests the Inventory container and the inventory_system functions built on it
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import inventory_system
+from inventory_system import Inventory
+from custom_exceptions import (
+    ItemNotFoundError,
+    InventoryFullError,
+    InsufficientResourcesError,
+    InvalidItemTypeError,
+    InvalidDataFormatError
+)
+
+# ============================================================================
+# INVENTORY CONTAINER TESTS
+# ============================================================================
+
+def test_inventory_behaves_like_a_list():
+    """Test list-style access on the counter-backed inventory"""
+    inventory = Inventory(['potion', 'sword', 'potion'])
+
+    assert len(inventory) == 3
+    assert 'potion' in inventory and 'shield' not in inventory
+    assert inventory.count('potion') == 2
+    assert inventory == ['potion', 'potion', 'sword']
+    assert inventory[0] == 'potion' and inventory[-1] == 'sword'
+
+    inventory.remove('potion')
+    inventory.append('shield')
+    assert inventory == ['potion', 'sword', 'shield']
+    with pytest.raises(ValueError):
+        inventory.remove('missing')
+
+    copy = inventory.copy()
+    inventory.clear()
+    assert len(inventory) == 0 and not inventory
+    assert len(copy) == 3
+
+def test_plain_list_inventories_are_converted():
+    """Test that characters built with plain lists still work"""
+    char = {'inventory': ['potion', 'potion'], 'gold': 0}
+
+    assert inventory_system.count_item(char, 'potion') == 2
+    assert isinstance(char['inventory'], Inventory)
+    inventory_system.remove_item_from_inventory(char, 'potion')
+    with pytest.raises(ItemNotFoundError):
+        inventory_system.remove_item_from_inventory(char, 'sword')
+    assert inventory_system.clear_inventory(char) == ['potion']
+
+def test_characters_use_inventory_and_save_as_list(tmp_path):
+    """Test that created and loaded characters carry an Inventory"""
+    char = character_manager.create_character("Packer", "Rogue")
+    assert isinstance(char['inventory'], Inventory)
+    assert character_manager.validate_character_data(char)
+
+    char['inventory'].extend(['potion', 'sword', 'potion'])
+    data = character_manager.serialize_character(char)
+    assert b"INVENTORY: potion,potion,sword" in data
+
+    loaded = character_manager.parse_character_save(data)
+    assert isinstance(loaded['inventory'], Inventory)
+    assert loaded['inventory'].count('potion') == 2
+
+def test_display_inventory_groups_counts():
+    """Test display_inventory lists each item once with its count"""
+    char = {'inventory': ['potion', 'sword', 'potion']}
+    items = {
+        'potion': {'name': 'Potion', 'type': 'consumable'},
+        'sword': {'name': 'Sword', 'type': 'weapon'},
+    }
+
+    lines = inventory_system.display_inventory(char, items).split("\n")
+
+    assert lines == ["Potion (x2) – consumable", "Sword (x1) – weapon"]
+
+# ============================================================================
+# CAPACITY AND STACKING TESTS
+# ============================================================================
+
+POTION = {'name': 'Potion', 'type': 'consumable', 'effect': 'health:20',
+          'cost': 5, 'stack_size': 10}
+
+def test_stacked_items_share_slots():
+    """Test that copies fill a stack before taking a new slot"""
+    char = {'inventory': [], 'gold': 1000, 'inventory_capacity': 2}
+
+    for _ in range(20):
+        inventory_system.add_item_to_inventory(char, 'potion', POTION)
+
+    assert len(char['inventory']) == 20
+    assert inventory_system.get_inventory_space_remaining(char) == 0
+    with pytest.raises(InventoryFullError):
+        inventory_system.purchase_item(char, 'potion', POTION)
+
+    # 19 potions still need two stacks; 10 fit in one
+    inventory_system.remove_item_from_inventory(char, 'potion')
+    assert inventory_system.get_inventory_space_remaining(char) == 0
+    for _ in range(9):
+        inventory_system.remove_item_from_inventory(char, 'potion')
+    assert inventory_system.get_inventory_space_remaining(char) == 1
+    inventory_system.purchase_item(char, 'potion', POTION)
+    assert char['gold'] == 995
+
+def test_unstacked_items_take_a_slot_each():
+    """Test the default of one slot per copy and the default capacity"""
+    char = {'inventory': []}
+    for _ in range(inventory_system.MAX_INVENTORY_SIZE):
+        inventory_system.add_item_to_inventory(char, 'rock')
+
+    with pytest.raises(InventoryFullError):
+        inventory_system.add_item_to_inventory(char, 'rock')
+
+def test_bank_sized_inventory():
+    """Test a 10k-slot inventory with registered stack sizes"""
+    inventory_system.set_item_stack_sizes({'potion': POTION})
+    try:
+        char = {'inventory': Inventory(['potion'] * 500), 'inventory_capacity': 10000}
+        for i in range(5000):
+            inventory_system.add_item_to_inventory(char, f'gem_{i}')
+
+        assert char['inventory'].slots == 5050
+        assert inventory_system.get_inventory_space_remaining(char) == 4950
+    finally:
+        inventory_system.set_item_stack_sizes({})
+
+def test_capacity_is_saved(tmp_path):
+    """Test that per-character capacity survives a save and load"""
+    char = character_manager.create_character("Banker", "Rogue")
+    char['inventory_capacity'] = 10000
+    character_manager.save_character(char, str(tmp_path))
+
+    loaded = character_manager.load_character("Banker", str(tmp_path))
+
+    assert loaded['inventory_capacity'] == 10000
+
+def test_item_stack_size_field(tmp_path):
+    """Test the optional STACK_SIZE field in item data files"""
+    import game_data
+
+    path = tmp_path / "items.txt"
+    path.write_text(
+        "ITEM_ID: potion\nNAME: Potion\nTYPE: consumable\nEFFECT: health:20\n"
+        "COST: 5\nDESCRIPTION: Heals\nSTACK_SIZE: 10\n\n"
+        "ITEM_ID: sword\nNAME: Sword\nTYPE: weapon\nEFFECT: strength:5\n"
+        "COST: 50\nDESCRIPTION: Sharp\n"
+    )
+
+    items = game_data.load_items(str(path), use_cache=False)
+
+    assert items['potion']['stack_size'] == 10
+    assert items['sword']['stack_size'] == 1
+
+# ============================================================================
+# TRANSACTION TESTS
+# ============================================================================
+
+SWORD = {'name': 'Sword', 'type': 'weapon', 'effect': 'strength:5', 'cost': 100}
+
+def test_transaction_applies_batch():
+    """Test a mixed buy/sell/use batch applied in one commit"""
+    char = {'inventory': ['sword'], 'gold': 20, 'health': 50, 'max_health': 100,
+            'inventory_capacity': 2}
+
+    with inventory_system.inventory_transaction(char) as tx:
+        # Only affordable because the sale is counted in the same batch
+        tx.sell('sword', SWORD)
+        tx.buy('potion', POTION, 12)
+        tx.use('potion', POTION, 2)
+
+    assert char['gold'] == 10
+    assert char['inventory'].count('potion') == 10 and 'sword' not in char['inventory']
+    assert char['health'] == 90
+    assert tx.results[0] == 50
+
+@pytest.mark.parametrize("operations, error", [
+    ([('buy', 'potion', POTION, 500)], InsufficientResourcesError),
+    ([('buy', 'potion', POTION, 30)], InventoryFullError),
+    ([('sell', 'sword', SWORD, 2)], ItemNotFoundError),
+])
+def test_transaction_rolls_back(operations, error):
+    """Test that a failing batch leaves the character untouched"""
+    char = {'inventory': ['sword'], 'gold': 200, 'health': 50, 'max_health': 100,
+            'inventory_capacity': 3}
+
+    with pytest.raises(error):
+        with inventory_system.inventory_transaction(char) as tx:
+            tx.buy('potion', POTION, 1)
+            for kind, item_id, item_data, quantity in operations:
+                getattr(tx, kind)(item_id, item_data, quantity)
+
+    assert char['gold'] == 200
+    assert list(char['inventory']) == ['sword']
+
+@pytest.mark.parametrize("kind, quantity", [
+    ('buy', -1), ('sell', -10), ('use', 0), ('buy', 1.5), ('sell', True),
+])
+def test_transaction_rejects_bad_quantities(kind, quantity):
+    """Test that only positive integer quantities can be queued"""
+    tx = inventory_system.InventoryTransaction({'inventory': ['potion'], 'gold': 1000})
+
+    with pytest.raises(ValueError):
+        getattr(tx, kind)('potion', POTION, quantity)
+
+def test_transaction_checks_counts_in_order():
+    """Test that an item bought later in the batch cannot be used earlier"""
+    char = {'inventory': [], 'gold': 100, 'health': 50, 'max_health': 100}
+
+    with pytest.raises(ItemNotFoundError):
+        with inventory_system.inventory_transaction(char) as tx:
+            tx.use('potion', POTION)
+            tx.buy('potion', POTION)
+
+    assert char['gold'] == 100 and char['health'] == 50 and len(char['inventory']) == 0
+
+    with inventory_system.inventory_transaction(char) as tx:
+        tx.buy('potion', POTION)
+        tx.use('potion', POTION)
+    assert char['gold'] == 95 and char['health'] == 70
+
+def test_transaction_discarded_on_exception():
+    """Test that an exception inside the block applies nothing"""
+    char = {'inventory': [], 'gold': 100}
+
+    with pytest.raises(RuntimeError):
+        with inventory_system.inventory_transaction(char) as tx:
+            tx.buy('potion', POTION)
+            raise RuntimeError("vendor closed")
+
+    assert char['gold'] == 100 and len(char['inventory']) == 0
+
+# ============================================================================
+# BASE AND EFFECTIVE STATS TESTS
+# ============================================================================
+
+IRON_SWORD = {'name': 'Iron Sword', 'type': 'weapon', 'effect': 'strength:5'}
+STEEL_SWORD = {'name': 'Steel Sword', 'type': 'weapon', 'effect': 'strength:10'}
+LEATHER = {'name': 'Leather Armor', 'type': 'armor', 'effect': 'max_health:10'}
+
+def test_equip_cycles_do_not_drift():
+    """Test that repeated equip/unequip returns to the base stats"""
+    char = character_manager.create_character("Cycler", "Warrior")
+    char['inventory'].extend(['iron_sword', 'steel_sword', 'leather'])
+
+    for _ in range(5):
+        inventory_system.equip_weapon(char, 'iron_sword', IRON_SWORD)
+        inventory_system.equip_weapon(char, 'steel_sword', STEEL_SWORD)
+        inventory_system.equip_armor(char, 'leather', LEATHER)
+        assert (char['strength'], char['max_health']) == (25, 130)
+        inventory_system.unequip_weapon(char)
+        inventory_system.unequip_armor(char)
+
+    assert (char['strength'], char['max_health']) == (15, 120)
+    assert char['base_stats'] == {'max_health': 120, 'strength': 15, 'magic': 5}
+    assert sorted(char['inventory']) == ['iron_sword', 'leather', 'steel_sword']
+
+def test_stats_version_tracks_changes():
+    """Test that the effective view only changes with equipment or base stats"""
+    char = character_manager.create_character("Versioned", "Rogue")
+    char['inventory'].append('iron_sword')
+    version = char['stats_version']
+
+    inventory_system.equip_weapon(char, 'iron_sword', IRON_SWORD)
+    assert char['stats_version'] == version + 1
+
+    character_manager.gain_experience(char, 100)
+    assert char['strength'] == 12 + 2 + 5
+    assert char['base_stats']['strength'] == 14
+
+    inventory_system.unequip_weapon(char)
+    assert char['strength'] == 14
+
+def test_equipment_survives_save(tmp_path):
+    """Test that bonuses are saved so base stats are restored on load"""
+    char = character_manager.create_character("Saver", "Mage")
+    char['inventory'].append('iron_sword')
+    inventory_system.equip_weapon(char, 'iron_sword', IRON_SWORD)
+    character_manager.save_character(char, str(tmp_path))
+
+    loaded = character_manager.load_character("Saver", str(tmp_path))
+    assert loaded['strength'] == 13 and loaded['base_stats']['strength'] == 8
+
+    inventory_system.unequip_weapon(loaded)
+    assert loaded['strength'] == 8
+
+V3_SAVE = ("VERSION: 3\nNAME: Old\nCLASS: Warrior\nLEVEL: 1\nHEALTH: 120\nMAX_HEALTH: 120\n"
+           "STRENGTH: 20\nMAGIC: 5\nEXPERIENCE: 0\nGOLD: 0\nINVENTORY: \nACTIVE_QUESTS: \n"
+           "COMPLETED_QUESTS: \nEQUIPPED_WEAPON: iron_sword\nEQUIPPED_ARMOR: \n"
+           "INVENTORY_CAPACITY: 20")
+
+def test_old_save_equipment_bonus_from_item_data():
+    """Test that bonuses missing from old saves come from the item data"""
+    inventory_system.set_item_data({'iron_sword': IRON_SWORD, 'potion': POTION})
+    try:
+        char = character_manager.parse_character_save(V3_SAVE)
+        assert char['base_stats']['strength'] == 15
+
+        inventory_system.unequip_weapon(char)
+        assert char['strength'] == 15
+        inventory_system.equip_weapon(char, 'iron_sword', IRON_SWORD)
+        assert char['strength'] == 20
+        assert inventory_system.ITEM_STACK_SIZES == {'potion': 10}
+    finally:
+        inventory_system.set_item_data({})
+
+def test_old_save_equipment_without_item_data():
+    """Test that unknown equipment bonuses are reported, not double-counted"""
+    char = character_manager.parse_character_save(V3_SAVE)
+
+    with pytest.raises(ItemNotFoundError):
+        inventory_system.unequip_weapon(char)
+    assert char['strength'] == 20 and char['equipped_weapon'] == 'iron_sword'
+
+# ============================================================================
+# EQUIPMENT SLOT TESTS
+# ============================================================================
+
+RING = {'name': 'Ring', 'type': 'armor', 'effect': 'strength:2,magic:3', 'slot': 'ring'}
+ELIXIR = {'name': 'Elixir', 'type': 'consumable', 'effect': 'health:10,magic:1'}
+
+RING_BLOCK = ("ITEM_ID: ring\nNAME: Ring\nTYPE: armor\nEFFECT: strength:2,magic:3\n"
+              "COST: 90\nDESCRIPTION: Shiny\nSLOT: ring\n")
+
+def test_multi_slot_equipment():
+    """Test equipping several slots with multi-stat items"""
+    char = character_manager.create_character("Slotted", "Mage")
+    char['inventory'].extend(['iron_sword', 'leather', 'ring', 'ring'])
+
+    assert inventory_system.equip_item(char, 'ring', RING) == "Equipped ring: Ring"
+    inventory_system.equip_item(char, 'ring', RING, slot='ring_2')
+    inventory_system.equip_item(char, 'iron_sword', IRON_SWORD)
+    inventory_system.equip_armor(char, 'leather', LEATHER)
+
+    assert char['equipment'] == {'ring': 'ring', 'ring_2': 'ring',
+                                 'weapon': 'iron_sword', 'armor': 'leather'}
+    assert char['equipped_weapon'] == 'iron_sword' and char['equipped_armor'] == 'leather'
+    assert (char['strength'], char['magic'], char['max_health']) == (17, 26, 90)
+
+    assert inventory_system.unequip_item(char, 'ring_2') == 'ring'
+    assert inventory_system.unequip_item(char, 'ring_2') is None
+    inventory_system.unequip_weapon(char)
+    assert (char['strength'], char['magic']) == (10, 23)
+    assert char['equipment'] == {'ring': 'ring', 'armor': 'leather'}
+
+def test_invalid_equipment_rejected():
+    """Test that consumables, bad slots and non-equipment stats are refused"""
+    char = {'inventory': ['elixir', 'ring', 'amulet'], 'strength': 10, 'magic': 10,
+            'max_health': 50, 'health': 50}
+    amulet = {'name': 'Amulet', 'type': 'armor', 'effect': 'health:5'}
+
+    with pytest.raises(InvalidItemTypeError):
+        inventory_system.equip_item(char, 'elixir', ELIXIR)
+    with pytest.raises(InvalidItemTypeError):
+        inventory_system.equip_item(char, 'ring', RING, slot='left;ring')
+    with pytest.raises(InvalidItemTypeError):
+        inventory_system.equip_item(char, 'amulet', amulet)
+    with pytest.raises(InvalidItemTypeError):
+        inventory_system.equip_weapon(char, 'ring', RING)
+    assert len(char['inventory']) == 3 and not char.get('equipment')
+
+def test_multi_stat_consumable():
+    """Test that every stat of a multi-stat consumable is applied"""
+    char = {'inventory': ['elixir', 'elixir'], 'health': 50, 'max_health': 100,
+            'magic': 5, 'strength': 5, 'gold': 0}
+
+    message = inventory_system.use_item(char, 'elixir', ELIXIR)
+    with inventory_system.inventory_transaction(char) as tx:
+        tx.use('elixir', ELIXIR)
+
+    assert message == "Used Elixir: health increased by 10, magic increased by 1."
+    assert (char['health'], char['magic']) == (70, 7)
+    assert inventory_system.parse_item_effects("strength:5,magic:3") == \
+        (('strength', 5), ('magic', 3))
+    with pytest.raises(InvalidItemTypeError):
+        inventory_system.parse_item_effect("strength:5,magic:3")
+
+def test_equipment_slots_saved(tmp_path):
+    """Test that every slot and its bonus vector survive a save"""
+    char = character_manager.create_character("Keeper", "Cleric")
+    char['inventory'].extend(['ring', 'iron_sword'])
+    inventory_system.equip_item(char, 'ring', RING)
+    inventory_system.equip_weapon(char, 'iron_sword', IRON_SWORD)
+    data = character_manager.serialize_character(char)
+    assert b"EQUIPMENT: ring=ring;weapon=iron_sword" in data
+    assert b"EQUIPMENT_BONUSES: ring=strength:2,magic:3;weapon=strength:5" in data
+
+    loaded = character_manager.parse_character_save(data)
+    assert loaded['equipment'] == char['equipment']
+    assert loaded['equipped_weapon'] == 'iron_sword' and loaded['equipped_armor'] is None
+    assert loaded['equipment_bonuses'] == char['equipment_bonuses']
+
+    inventory_system.unequip_item(loaded, 'ring')
+    assert loaded['base_stats'] == char['base_stats']
+    assert loaded['magic'] == char['base_stats']['magic']
+
+def test_version_four_saves_are_migrated():
+    """Test that weapon and armor fields become equipment slots"""
+    char = character_manager.create_character("Legacy", "Warrior")
+    data = character_manager.serialize_character(char).decode()
+    data = data.replace(f"VERSION: {character_manager.SAVE_VERSION}", "VERSION: 4")
+    data = data.replace("EQUIPMENT: ", "EQUIPPED_WEAPON: iron_sword\nEQUIPPED_ARMOR: ")
+    data = data.replace("EQUIPMENT_BONUSES: ", "EQUIPMENT_BONUSES: weapon=strength:5")
+
+    loaded = character_manager.parse_character_save(data)
+
+    assert loaded['equipment'] == {'weapon': 'iron_sword'}
+    assert loaded['equipped_weapon'] == 'iron_sword' and loaded['equipped_armor'] is None
+    assert loaded['base_stats']['strength'] == 10
+
+@pytest.mark.parametrize("extension", [".txt", ".jsonl", ".qcb"])
+def test_item_bonus_vectors_precomputed(tmp_path, extension):
+    """Test that loaded items carry their slot and a ready bonus vector"""
+    import game_data
+
+    source = tmp_path / "items.txt"
+    source.write_text(RING_BLOCK)
+    game_data.write_items(game_data.load_items(str(source), use_cache=False),
+                          str(tmp_path / ("copy" + extension)))
+
+    ring = game_data.load_items(str(tmp_path / ("copy" + extension)))['ring']
+    assert ring['effect'] == (('strength', 2), ('magic', 3))
+    assert ring.bonuses == (0, 0, 2, 3) and ring['slot'] == 'ring'
+    with game_data.open_item_catalog(str(source)) as catalog:
+        assert catalog['ring'] == ring and catalog['ring'].bonuses == ring.bonuses
+
+    char = {'inventory': ['ring'], 'strength': 10, 'magic': 10, 'max_health': 50}
+    inventory_system.equip_item(char, 'ring', ring)
+    assert char['equipment'] == {'ring': 'ring'} and char['magic'] == 13
+
+def test_unknown_effect_stats_rejected(tmp_path):
+    """Test that item files naming an unknown stat fail validation"""
+    import game_data
+
+    path = tmp_path / "items.txt"
+    path.write_text(RING_BLOCK.replace("magic:3", "luck:3"))
+
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_items(str(path), use_cache=False)
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
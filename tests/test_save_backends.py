@@ -0,0 +1,663 @@
+"""
+Test Save Backends
+Tests the pluggable character persistence layer in character_manager
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+# character_manager raises its own exception classes for persistence errors
+CharacterNotFoundError = character_manager.CharacterNotFoundError
+InvalidSaveDataError = character_manager.InvalidSaveDataError
+
+
+def make_characters(count, character_class="Warrior"):
+    """Create `count` characters named hero_000, hero_001, ..."""
+    return [character_manager.create_character(f"hero_{i:03d}", character_class)
+            for i in range(count)]
+
+# ============================================================================
+# BACKEND TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("location", ["saves", "saves.db"])
+def test_backends_round_trip(tmp_path, location):
+    """Test save/load/list/delete on the file and SQLite backends"""
+    location = str(tmp_path / location)
+    char = character_manager.create_character("Backend", "Cleric")
+    char['inventory'] = ['health_potion', 'iron_sword']
+    char['gold'] = 321
+
+    assert character_manager.save_character(char, location) == True
+    loaded = character_manager.load_character("Backend", location)
+
+    assert loaded['gold'] == 321
+    assert list(loaded['inventory']) == ['health_potion', 'iron_sword']
+    assert character_manager.list_saved_characters(location) == ["Backend"]
+
+    character_manager.delete_character("Backend", location)
+    assert character_manager.list_saved_characters(location) == []
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("Backend", location)
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.delete_character("Backend", location)
+
+@pytest.mark.parametrize("location", ["saves", "saves.db"])
+def test_list_saved_characters_pages(tmp_path, location):
+    """Test keyset pagination of saved character names"""
+    location = str(tmp_path / location)
+    for char in make_characters(7):
+        character_manager.save_character(char, location)
+
+    first = character_manager.list_saved_characters(location, limit=3)
+    second = character_manager.list_saved_characters(location, after=first[-1], limit=3)
+    rest = character_manager.list_saved_characters(location, after=second[-1])
+
+    assert first == ["hero_000", "hero_001", "hero_002"]
+    assert second == ["hero_003", "hero_004", "hero_005"]
+    assert rest == ["hero_006"]
+
+def test_sqlite_backend_selected_by_extension(tmp_path):
+    """Test that .db locations use one SQLite file instead of a directory"""
+    location = str(tmp_path / "players.sqlite3")
+    character_manager.save_character(make_characters(1)[0], location)
+
+    assert isinstance(character_manager.get_save_backend(location),
+                      character_manager.SQLiteSaveBackend)
+    assert os.path.isfile(location)
+
+def test_invalid_numeric_field(tmp_path):
+    """Test that a non-numeric stat is reported as InvalidSaveDataError"""
+    char = make_characters(1)[0]
+    character_manager.save_character(char, str(tmp_path))
+    path = os.path.join(str(tmp_path), "hero_000_save.txt")
+    with open(path) as f:
+        text = f.read().replace("GOLD: 100", "GOLD: lots")
+    with open(path, "w") as f:
+        f.write(text)
+
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.load_character("hero_000", str(tmp_path))
+
+# ============================================================================
+# SAVE FORMAT TESTS
+# ============================================================================
+
+def test_version_one_saves_are_migrated():
+    """Test that unversioned saves without equipment still load"""
+    old = ("NAME: Old\nCLASS: Rogue\nLEVEL: 3\nHEALTH: 50\nMAX_HEALTH: 75\n"
+           "STRENGTH: 12\nMAGIC: 10\nEXPERIENCE: 5\nGOLD: 7\nINVENTORY: a,b\n"
+           "ACTIVE_QUESTS: \nCOMPLETED_QUESTS: q1")
+
+    char = character_manager.parse_character_save(old)
+
+    assert char['inventory'] == ['a', 'b']
+    assert char['equipped_weapon'] is None and char['equipped_armor'] is None
+
+def test_newer_save_version_rejected():
+    """Test that saves from a newer schema are reported, not misread"""
+    data = character_manager.serialize_character(make_characters(1)[0])
+    version = f"VERSION: {character_manager.SAVE_VERSION}".encode()
+    data = data.replace(version, b"VERSION: 99")
+
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.parse_character_save(data)
+
+@pytest.mark.parametrize("compression", ["zlib", "lzma"])
+def test_compressed_saves(compression):
+    """Test that compressed saves round-trip and shrink large saves"""
+    char = make_characters(1)[0]
+    char['completed_quests'] = [f"quest_number_{i}" for i in range(1000)]
+    char['equipped_weapon'] = "iron_sword"
+
+    plain = character_manager.serialize_character(char)
+    packed = character_manager.serialize_character(char, compression)
+    loaded = character_manager.parse_character_save(packed)
+
+    assert len(packed) * 3 < len(plain)
+    assert loaded['completed_quests'] == char['completed_quests']
+    assert loaded['equipped_weapon'] == "iron_sword"
+
+def test_deltas_read_by_default_backend(tmp_path):
+    """Test that a plain backend applies, then supersedes, existing deltas"""
+    location = str(tmp_path)
+    writer = character_manager.FileSaveBackend(location, deltas=True)
+    char = make_characters(1)[0]
+    for gold in (0, 1, 2, 3):
+        char['gold'] = gold
+        writer.save("hero_000", character_manager.serialize_character(char))
+    writer.close()
+
+    assert character_manager.load_character("hero_000", location)['gold'] == 3
+    character_manager.rebuild_character_index(location)
+    assert character_manager.top_characters("gold", 1, location) == [("hero_000", 3)]
+
+    # Same bytes as the snapshot the deltas were written against
+    char['gold'] = 0
+    character_manager.save_character(char, location)
+    assert character_manager.load_character("hero_000", location)['gold'] == 0
+    assert not os.path.exists(writer.delta_path("hero_000"))
+
+def test_compressed_saves_with_deltas(tmp_path):
+    """Test that delta saves accept compressed save data"""
+    backend = character_manager.FileSaveBackend(str(tmp_path), deltas=True)
+    char = make_characters(1)[0]
+    for gold in (1, 2):
+        char['gold'] = gold
+        backend.save("hero_000", character_manager.serialize_character(char, "zlib"))
+
+    assert character_manager.parse_character_save(backend.load("hero_000"))['gold'] == 2
+
+# ============================================================================
+# CRASH SAFETY TESTS
+# ============================================================================
+
+def test_save_replaces_file_atomically(tmp_path):
+    """Test that saving leaves no temp files and overwrites in place"""
+    char = make_characters(1)[0]
+    character_manager.save_character(char, str(tmp_path))
+    char['gold'] = 999
+    character_manager.save_character(char, str(tmp_path))
+
+    saves = [f for f in os.listdir(str(tmp_path)) if not f.startswith(".")]
+    assert saves == ["hero_000_save.txt"]
+    assert character_manager.load_character("hero_000", str(tmp_path))['gold'] == 999
+
+def test_journal_recovers_truncated_save(tmp_path):
+    """Test that a torn save file is restored from the journal"""
+    location = str(tmp_path / "journaled")
+    backend = character_manager.register_save_backend(
+        location, character_manager.FileSaveBackend(location, journal=True))
+    char = make_characters(1)[0]
+    char['gold'] = 555
+    character_manager.save_character(char, location)
+
+    # Simulate a crash that left half a file behind
+    with open(backend.save_path("hero_000"), "wb") as f:
+        f.write(b"NAME: hero_000\nCLA")
+
+    assert character_manager.load_character("hero_000", location)['gold'] == 555
+    with open(backend.save_path("hero_000"), "rb") as f:
+        assert b"GOLD: 555" in f.read()
+
+def test_journal_replay_and_torn_tail(tmp_path):
+    """Test replaying the journal and ignoring a torn final record"""
+    location = str(tmp_path / "journaled")
+    backend = character_manager.FileSaveBackend(location, journal=True)
+    character_manager.register_save_backend(location, backend)
+    first, second = make_characters(2)
+    character_manager.save_character(first, location)
+    character_manager.save_character(second, location)
+    character_manager.delete_character("hero_001", location)
+    backend.close()
+
+    with open(backend.journal_path, "ab") as f:
+        f.write(b"\x05\x00garbage")
+    os.remove(backend.save_path("hero_000"))
+
+    restored = character_manager.FileSaveBackend(location, journal=True)
+    assert restored.replay_journal() == ["hero_000"]
+    assert character_manager.list_saved_characters(location) == ["hero_000"]
+
+    # New records are appended after the torn tail is dropped
+    restored.save("hero_002", character_manager.serialize_character(make_characters(3)[2]))
+    assert "hero_002" in restored._read_journal()
+
+def test_journal_compaction(tmp_path):
+    """Test that the journal is compacted once it grows too large"""
+    location = str(tmp_path / "journaled")
+    backend = character_manager.FileSaveBackend(location, journal=True, max_journal_bytes=2000)
+    char = make_characters(1)[0]
+    for gold in range(20):
+        char['gold'] = gold
+        backend.save("hero_000", character_manager.serialize_character(char))
+
+    assert os.path.getsize(backend.journal_path) < 2000
+    assert b"GOLD: 19" in backend._read_journal()["hero_000"]
+
+# ============================================================================
+# BULK API TESTS
+# ============================================================================
+
+@pytest.mark.parametrize("location", ["saves", "saves.db"])
+def test_bulk_save_and_load(tmp_path, location):
+    """Test that bulk calls report per-name results without aborting"""
+    location = str(tmp_path / location)
+    chars = make_characters(50)
+    broken = {"name": "broken"}
+
+    saved = character_manager.save_characters(chars + [broken], location, workers=4)
+    assert all(saved[char['name']] is True for char in chars)
+    assert isinstance(saved["broken"], Exception)
+
+    names = [char['name'] for char in chars] + ["missing"]
+    loaded = character_manager.load_characters(names, location, workers=4)
+
+    assert len(loaded) == 51
+    assert loaded["hero_042"]['name'] == "hero_042"
+    assert isinstance(loaded["missing"], CharacterNotFoundError)
+
+def test_bulk_load_reports_invalid_saves(tmp_path):
+    """Test that a corrupted save is returned as InvalidSaveDataError"""
+    location = str(tmp_path)
+    character_manager.save_characters(make_characters(3), location)
+    with open(os.path.join(location, "hero_001_save.txt"), "w") as f:
+        f.write("not a save")
+
+    loaded = character_manager.load_characters(["hero_000", "hero_001", "hero_002"], location)
+
+    assert isinstance(loaded["hero_001"], InvalidSaveDataError)
+    assert loaded["hero_002"]['class'] == "Warrior"
+
+# ============================================================================
+# SECONDARY INDEX TESTS
+# ============================================================================
+
+def make_ranked_characters(count):
+    chars = make_characters(count)
+    for i, char in enumerate(chars):
+        char['class'] = "Warrior" if i % 2 == 0 else "Mage"
+        char['level'] = i
+        char['gold'] = 1000 - i * 10
+        char['experience'] = i * 100
+    return chars
+
+@pytest.mark.parametrize("location", ["saves", "saves.db"])
+def test_index_queries(tmp_path, location):
+    """Test range and top-k queries answered from the index"""
+    location = str(tmp_path / location)
+    character_manager.save_characters(make_ranked_characters(30), location)
+
+    warriors = character_manager.find_characters(location, character_class="Warrior", min_level=20)
+    assert warriors == ["hero_020", "hero_022", "hero_024", "hero_026", "hero_028"]
+    assert character_manager.find_characters(location, min_gold=900, max_experience=500) == \
+        [f"hero_{i:03d}" for i in range(6)]
+
+    top = character_manager.top_characters("experience", 3, location, character_class="Mage")
+    assert top == [("hero_029", 2900), ("hero_027", 2700), ("hero_025", 2500)]
+
+def test_index_follows_saves_and_deletes(tmp_path):
+    """Test that save_character and delete_character keep the index current"""
+    location = str(tmp_path)
+    chars = make_ranked_characters(5)
+    for char in chars:
+        character_manager.save_character(char, location)
+
+    chars[4]['gold'] = 5000
+    character_manager.save_character(chars[4], location)
+    character_manager.delete_character("hero_000", location)
+
+    assert character_manager.top_characters("gold", 2, location) == [("hero_004", 5000), ("hero_001", 990)]
+    assert "hero_000" not in character_manager.find_characters(location)
+
+def test_index_built_for_existing_saves(tmp_path):
+    """Test that an index over a directory saved without one is filled in"""
+    location = str(tmp_path)
+    backend = character_manager.FileSaveBackend(location, index=False)
+    for char in make_ranked_characters(4):
+        backend.save(char['name'], character_manager.serialize_character(char))
+
+    assert character_manager.find_characters(location, min_level=2) == ["hero_002", "hero_003"]
+    assert character_manager.rebuild_character_index(location) == 4
+
+def test_index_updates_deferred_off_save_path(tmp_path):
+    """Test that saves queue index rows and queries apply them in one go"""
+    import sqlite3
+
+    location = str(tmp_path)
+    backend = character_manager.register_save_backend(
+        location, character_manager.FileSaveBackend(location))
+    character_manager.save_characters(make_ranked_characters(5), location)
+
+    index_path = os.path.join(location, backend.INDEX_NAME)
+    with sqlite3.connect(index_path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM character_index").fetchone()[0] == 0
+
+    assert len(character_manager.find_characters(location)) == 5
+    with sqlite3.connect(index_path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM character_index").fetchone()[0] == 5
+    backend.close()
+
+def test_index_rebuilt_after_crash(tmp_path):
+    """Test that an index left behind its saves is rebuilt on next use"""
+    location = str(tmp_path)
+    chars = make_ranked_characters(3)
+    character_manager.save_characters(chars, location)
+    character_manager.find_characters(location)
+
+    # Queued but never applied: the process "crashes" before close()
+    crashed = character_manager.FileSaveBackend(location)
+    chars[0]['gold'] = 7777
+    crashed.save("hero_000", character_manager.serialize_character(chars[0]),
+                 character_manager.index_row(chars[0]))
+
+    restarted = character_manager.register_save_backend(
+        location, character_manager.FileSaveBackend(location))
+    assert character_manager.top_characters("gold", 1, location) == [("hero_000", 7777)]
+    restarted.close()
+
+# ============================================================================
+# CHARACTER CACHE TESTS
+# ============================================================================
+
+@pytest.fixture
+def character_cache():
+    cache = character_manager.enable_character_cache(max_entries=2)
+    yield cache
+    character_manager.disable_character_cache()
+
+def test_cache_hits_return_copies(tmp_path, character_cache):
+    """Test that repeat loads hit the cache and can't mutate it"""
+    character_manager.save_character(make_characters(1)[0], str(tmp_path))
+
+    first = character_manager.load_character("hero_000", str(tmp_path))
+    first['inventory'].append("stolen_item")
+    second = character_manager.load_character("hero_000", str(tmp_path))
+
+    assert second['inventory'] == []
+    stats = character_manager.get_character_cache_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+def test_cache_invalidated_by_save_and_delete(tmp_path, character_cache):
+    """Test that the cache never serves stale or deleted characters"""
+    char = make_characters(1)[0]
+    character_manager.save_character(char, str(tmp_path))
+    character_manager.load_character("hero_000", str(tmp_path))
+
+    char['gold'] = 4242
+    character_manager.save_character(char, str(tmp_path))
+    assert character_manager.load_character("hero_000", str(tmp_path))['gold'] == 4242
+
+    character_manager.delete_character("hero_000", str(tmp_path))
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("hero_000", str(tmp_path))
+
+def test_cache_not_refilled_by_load_during_save(tmp_path, character_cache):
+    """Test that a load racing a save can't cache the old save"""
+    location = str(tmp_path)
+
+    class RacingBackend(character_manager.FileSaveBackend):
+        def save(self, name, data, index_row=None):
+            # Another thread loads while this save is still being written
+            character_manager.load_character(name, location)
+            super().save(name, data, index_row)
+
+    char = make_characters(1)[0]
+    character_manager.save_character(char, location)
+    character_manager.register_save_backend(location, RacingBackend(location))
+
+    char['gold'] = 999
+    character_manager.save_character(char, location)
+
+    assert character_manager.load_character("hero_000", location)['gold'] == 999
+
+def test_cache_evicts_least_recently_used(tmp_path, character_cache):
+    """Test LRU eviction by entry count"""
+    character_manager.save_characters(make_characters(3), str(tmp_path))
+    for name in ["hero_000", "hero_001", "hero_000", "hero_002", "hero_000"]:
+        character_manager.load_character(name, str(tmp_path))
+
+    stats = character_manager.get_character_cache_stats()
+    assert stats['evictions'] == 1
+    assert stats['hits'] == 2
+    assert character_cache.get((str(tmp_path), "hero_001")) is None
+
+# ============================================================================
+# ASYNC API TESTS
+# ============================================================================
+
+def test_async_round_trip(tmp_path):
+    """Test the asyncio variants against the same save files"""
+    import asyncio
+
+    async def scenario():
+        chars = make_characters(5)
+        await asyncio.gather(*(character_manager.async_save_character(char, str(tmp_path))
+                               for char in chars))
+        names = await character_manager.async_list_saved_characters(str(tmp_path))
+        loaded = await character_manager.async_load_character("hero_003", str(tmp_path))
+        with pytest.raises(CharacterNotFoundError):
+            await character_manager.async_load_character("missing", str(tmp_path))
+        return names, loaded
+
+    names, loaded = asyncio.run(scenario())
+
+    assert names == [f"hero_{i:03d}" for i in range(5)]
+    assert loaded == character_manager.load_character("hero_003", str(tmp_path))
+
+def test_concurrent_saves_of_one_character(tmp_path):
+    """Test that simultaneous saves of the same name never collide"""
+    import asyncio
+
+    async def scenario():
+        chars = []
+        for gold in range(8):
+            char = make_characters(1)[0]
+            char['gold'] = gold
+            chars.append(char)
+        for _ in range(10):
+            await asyncio.gather(*(character_manager.async_save_character(char, str(tmp_path))
+                                   for char in chars))
+
+    asyncio.run(scenario())
+
+    assert character_manager.load_character("hero_000", str(tmp_path))['gold'] in range(8)
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+# ============================================================================
+# DELTA SAVE TESTS
+# ============================================================================
+
+def test_delta_saves_append_changed_fields(tmp_path):
+    """Test that delta saves write only changed lines and load the latest state"""
+    location = str(tmp_path / "deltas")
+    backend = character_manager.register_save_backend(
+        location, character_manager.FileSaveBackend(location, deltas=True, max_deltas=100))
+    char = make_characters(1)[0]
+    char['completed_quests'] = [f"quest_{i}" for i in range(500)]
+    character_manager.save_character(char, location)
+    snapshot_size = os.path.getsize(backend.save_path("hero_000"))
+
+    for gold in range(10):
+        char['gold'] = gold
+        character_manager.save_character(char, location)
+
+    assert os.path.getsize(backend.delta_path("hero_000")) < snapshot_size
+    loaded = character_manager.load_character("hero_000", location)
+    assert loaded['gold'] == 9
+    assert len(loaded['completed_quests']) == 500
+
+    # A fresh backend rebuilds the same state from disk
+    fresh = character_manager.FileSaveBackend(location, deltas=True)
+    assert b"GOLD: 9" in fresh.load("hero_000")
+
+def test_delta_saves_compact_and_delete(tmp_path):
+    """Test compaction after max_deltas and that delete removes the delta file"""
+    location = str(tmp_path / "deltas")
+    backend = character_manager.register_save_backend(
+        location, character_manager.FileSaveBackend(location, deltas=True, max_deltas=3))
+    char = make_characters(1)[0]
+    for gold in range(5):
+        char['gold'] = gold
+        character_manager.save_character(char, location)
+
+    # Save 0 is the snapshot, 1-3 are deltas, 4 compacts into a new snapshot
+    assert not os.path.exists(backend.delta_path("hero_000"))
+    with open(backend.save_path("hero_000"), "rb") as f:
+        assert b"GOLD: 4" in f.read()
+
+    char['gold'] = 77
+    character_manager.save_character(char, location)
+    assert os.path.exists(backend.delta_path("hero_000"))
+    character_manager.delete_character("hero_000", location)
+    assert [f for f in os.listdir(location) if not f.startswith(".")] == []
+
+def test_delta_saves_ignore_torn_tail(tmp_path):
+    """Test that a torn final delta is ignored on load"""
+    location = str(tmp_path / "deltas")
+    backend = character_manager.FileSaveBackend(location, deltas=True)
+    char = make_characters(1)[0]
+    backend.save("hero_000", character_manager.serialize_character(char))
+    char['gold'] = 250
+    backend.save("hero_000", character_manager.serialize_character(char))
+
+    with open(backend.delta_path("hero_000"), "ab") as f:
+        f.write(b"\x40\x00\x00\x00garbage")
+
+    fresh = character_manager.FileSaveBackend(location, deltas=True)
+    assert character_manager.parse_character_save(fresh.load("hero_000"))['gold'] == 250
+
+# ============================================================================
+# SHARDED LAYOUT TESTS
+# ============================================================================
+
+def test_sharded_layout_round_trip(tmp_path):
+    """Test that sharded saves live under two hex prefix directories"""
+    location = str(tmp_path / "sharded")
+    backend = character_manager.register_save_backend(
+        location, character_manager.FileSaveBackend(location, layout="sharded"))
+    for char in make_characters(20):
+        character_manager.save_character(char, location)
+
+    path = backend.save_path("hero_007")
+    relative = os.path.relpath(path, location).split(os.sep)
+    assert len(relative) == 3 and all(len(part) == 2 for part in relative[:2])
+    assert os.path.isfile(path)
+
+    assert character_manager.list_saved_characters(location, limit=2) == ["hero_000", "hero_001"]
+    assert character_manager.load_character("hero_007", location)['name'] == "hero_007"
+    character_manager.delete_character("hero_007", location)
+    assert not os.path.exists(path)
+    assert len(character_manager.list_saved_characters(location)) == 19
+
+def test_migrate_flat_to_sharded(tmp_path):
+    """Test online migration keeps newer saves and reads both layouts"""
+    location = str(tmp_path / "saves")
+    backend = character_manager.register_save_backend(
+        location, character_manager.FileSaveBackend(location))
+    chars = make_characters(10)
+    for char in chars:
+        character_manager.save_character(char, location)
+
+    # A save made after switching layouts must win over the old flat copy
+    backend.layout = "sharded"
+    chars[3]['gold'] = 999
+    character_manager.save_character(chars[3], location)
+    assert character_manager.load_character("hero_004", location)['gold'] == 100
+    assert len(character_manager.list_saved_characters(location)) == 10
+
+    assert character_manager.migrate_save_layout(location, "sharded") == 9
+    assert [f for f in os.listdir(location) if f.endswith("_save.txt")] == []
+    assert character_manager.load_character("hero_003", location)['gold'] == 999
+    assert len(character_manager.list_saved_characters(location)) == 10
+
+def test_migrated_layout_survives_restart(tmp_path):
+    """Test that a restarted process keeps saving in the migrated layout"""
+    location = str(tmp_path / "saves")
+    char = make_characters(1)[0]
+    char['gold'] = 1
+    character_manager.save_character(char, location)
+    character_manager.migrate_save_layout(location, "sharded")
+
+    # A new process gets a fresh backend for the directory
+    character_manager._save_backends.pop(location)
+    char['gold'] = 999
+    character_manager.save_character(char, location)
+    assert character_manager.get_save_backend(location).layout == "sharded"
+
+    character_manager.migrate_save_layout(location, "sharded")
+    assert character_manager.load_character("hero_000", location)['gold'] == 999
+
+def test_migrate_keeps_newer_copy(tmp_path):
+    """Test that a newer save left in the old layout replaces the stale copy"""
+    location = str(tmp_path / "saves")
+    char = make_characters(1)[0]
+    sharded = character_manager.FileSaveBackend(location, layout="sharded")
+    sharded.save("hero_000", character_manager.serialize_character(char))
+    os.utime(sharded.save_path("hero_000"), ns=(1, 1))
+
+    flat = character_manager.register_save_backend(
+        location, character_manager.FileSaveBackend(location, layout="flat"))
+    char['gold'] = 999
+    flat.save("hero_000", character_manager.serialize_character(char))
+
+    assert character_manager.migrate_save_layout(location, "sharded") == 1
+    assert not os.path.exists(flat.save_path("hero_000", "flat"))
+    assert character_manager.load_character("hero_000", location)['gold'] == 999
+
+def test_save_during_migration_lands_in_new_layout(tmp_path):
+    """Test that a save whose layout changes mid-write follows the switch"""
+    location = str(tmp_path / "saves")
+    backend = character_manager.register_save_backend(
+        location, character_manager.FileSaveBackend(location))
+    char = make_characters(1)[0]
+    character_manager.save_character(char, location)
+
+    write_temp = backend._write_temp
+    def migrate_mid_write(filepath, data):
+        temp_path = write_temp(filepath, data)
+        if backend.layout == "flat":
+            backend.migrate_layout("sharded")
+        return temp_path
+    backend._write_temp = migrate_mid_write
+
+    char['gold'] = 999
+    character_manager.save_character(char, location)
+    assert os.path.exists(backend.save_path("hero_000", "sharded"))
+    assert not os.path.exists(backend.save_path("hero_000", "flat"))
+    assert character_manager.load_character("hero_000", location)['gold'] == 999
+
+# ============================================================================
+# WRITE-BEHIND SAVER TESTS
+# ============================================================================
+
+def test_write_behind_coalesces_bursts(tmp_path):
+    """Test that many marks for one character become a single write"""
+    saver = character_manager.WriteBehindSaver(str(tmp_path), flush_interval=60, max_staleness=60)
+    char = make_characters(1)[0]
+
+    for gold in range(50):
+        char['gold'] = gold
+        saver.mark_dirty(char)
+
+    assert saver.is_dirty("hero_000")
+    assert character_manager.list_saved_characters(str(tmp_path)) == []
+
+    assert saver.flush() == 1
+    assert saver.writes == 1
+    assert character_manager.load_character("hero_000", str(tmp_path))['gold'] == 49
+    saver.close()
+
+def test_write_behind_snapshots_state(tmp_path):
+    """Test that later changes are not written until marked again"""
+    saver = character_manager.WriteBehindSaver(str(tmp_path), flush_interval=60)
+    char = make_characters(1)[0]
+    saver.mark_dirty(char)
+    char['gold'] = 12345
+
+    saver.close()
+
+    assert character_manager.load_character("hero_000", str(tmp_path))['gold'] == 100
+
+def test_write_behind_background_flush(tmp_path):
+    """Test that the background thread honours max_staleness"""
+    import time
+
+    saver = character_manager.WriteBehindSaver(str(tmp_path), flush_interval=60, max_staleness=0.05)
+    saver.mark_dirty(make_characters(1)[0])
+
+    deadline = time.monotonic() + 5
+    while saver.is_dirty("hero_000") and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not saver.is_dirty("hero_000")
+    assert character_manager.list_saved_characters(str(tmp_path)) == ["hero_000"]
+    saver.close()
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])